@@ -1,27 +1,26 @@
-from flask import Flask, request, jsonify
-import base64
+from flask import Flask, Response, request, jsonify, stream_with_context
 import time
-from extractor import extract_text
-from ranker import rank_resumes, get_semantic_model
-from parser import get_ner_pipeline
-from utils import validate_request, format_error_response, format_success_response, logger
-from config import DEFAULT_TOP_K, REQUEST_TIMEOUT
+from extractor import get_text_cache_stats
+from resume_sources import uploaded_file_documents
+from service import (
+    warmup_models, parse_upload_form, rank_uploaded_documents, rank_json_request,
+    parse_stream_json, stream_ranking, parse_multi_params, parse_multi_json, rank_multi_documents,
+    corpus_search_request, parse_ingest_json, ingest_documents, delete_corpus_resume,
+    submit_s3_job, submit_upload_job, job_status, job_result
+)
+from utils import format_error_response, logger
+from config import (
+    DEFAULT_TOP_K, REQUEST_TIMEOUT, MAX_INGEST_PER_REQUEST, MAX_RESUMES_PER_JOB, MAX_RESUMES_PER_REQUEST
+)
 
 app = Flask(__name__)
 
 
-def warmup_models():
-    logger.info("Warming up ML models...")
-    try:
-        get_semantic_model()
-        get_ner_pipeline()
-        logger.info("Models warmed up successfully")
-    except Exception as e:
-        logger.error(f"Error warming up models: {str(e)}")
-
-
-with app.app_context():
-    warmup_models()
+# Spawned extraction workers re-import this script as __mp_main__; only the
+# serving process should load the models
+if __name__ != '__mp_main__':
+    with app.app_context():
+        warmup_models()
 
 
 @app.route('/health', methods=['GET'])
@@ -29,7 +28,8 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "service": "Resume Ranking API",
-        "version": "2.0"
+        "version": "2.0",
+        "text_cache": get_text_cache_stats()
     }), 200
 
 
@@ -39,21 +39,10 @@ def rank_resumes_upload_endpoint():
     start_time = time.time()
 
     try:
-        job_description = request.form.get('job_description')
-
-        if not job_description:
-            return jsonify(format_error_response("Missing 'job_description' field")), 400
-
-        if len(job_description.strip()) < 50:
-            return jsonify(format_error_response("Job description is too short (minimum 50 characters)")), 400
-
-        top_k = request.form.get('top_k', DEFAULT_TOP_K)
-        try:
-            top_k = int(top_k)
-            if top_k < 1:
-                return jsonify(format_error_response("'top_k' must be a positive integer")), 400
-        except ValueError:
-            return jsonify(format_error_response("'top_k' must be a valid integer")), 400
+        params, error = parse_upload_form(request.form)
+        if error:
+            body, status = error
+            return jsonify(body), status
 
         files = request.files.getlist('resumes')
 
@@ -61,68 +50,72 @@ def rank_resumes_upload_endpoint():
             return jsonify(format_error_response("No resume files provided")), 400
 
         logger.info(
-            f"Processing {len(files)} uploaded resumes, returning top {top_k}")
+            f"Processing {len(files)} uploaded resumes, returning top {params['top_k']}")
 
-        resumes_data = []
+        documents = uploaded_file_documents(files)
 
-        for i, file in enumerate(files):
-            try:
-                if not file or file.filename == '':
-                    logger.warning(f"Resume {i}: Empty file")
-                    continue
+        body, status = rank_uploaded_documents(documents, start_time=start_time, **params)
+        return jsonify(body), status
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-                filename = file.filename.lower()
-                if filename.endswith('.pdf'):
-                    file_type = 'pdf'
-                elif filename.endswith('.docx'):
-                    file_type = 'docx'
-                else:
-                    logger.warning(
-                        f"Resume {i}: Unsupported file type - {filename}")
-                    continue
 
-                file_bytes = file.read()
+@app.route('/rank_resumes', methods=['POST'])
+def rank_resumes_endpoint():
 
-                if len(file_bytes) == 0:
-                    logger.warning(f"Resume {i}: Empty file content")
-                    continue
+    start_time = time.time()
+
+    try:
+        # Get request data
+        data = request.json
 
-                text = extract_text(file_bytes, file_type)
+        body, status = rank_json_request(data, start_time)
+        return jsonify(body), status
 
-                if not text or len(text.strip()) < 50:
-                    logger.warning(
-                        f"Resume {i} ({filename}): Insufficient text content")
-                    continue
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-                resumes_data.append({
-                    'index': i,
-                    'text': text,
-                    'file_type': file_type,
-                    'filename': filename
-                })
 
-            except Exception as e:
-                logger.error(f"Error processing resume {i}: {str(e)}")
-                continue
+@app.route('/rank_resumes_stream', methods=['POST'])
+def rank_resumes_stream_endpoint():
+    """Stream NDJSON results (multipart 'resumes' files or JSON base64)"""
 
-        if not resumes_data:
-            return jsonify(format_error_response(
-                "No valid resumes could be processed. Please check file formats and content."
-            )), 400
+    start_time = time.time()
 
-        if top_k > len(resumes_data):
-            top_k = len(resumes_data)
+    try:
+        if request.files:
+            params, error = parse_upload_form(request.form)
+            if error:
+                body, status = error
+                return jsonify(body), status
 
-        ranked_results = rank_resumes(resumes_data, job_description, top_k)
+            files = request.files.getlist('resumes')
+            if not files:
+                return jsonify(format_error_response("No resume files provided")), 400
 
-        processing_time = round(time.time() - start_time, 2)
+            documents = uploaded_file_documents(files)
+        else:
+            params, error = parse_stream_json(request.json)
+            if error:
+                body, status = error
+                return jsonify(body), status
 
-        logger.info(f"Request completed in {processing_time}s")
+            documents = params['documents']
 
-        response = format_success_response(ranked_results, len(resumes_data))
-        response['processing_time_seconds'] = processing_time
+        logger.info(
+            f"Streaming ranking of {len(documents)} resumes, returning top {params['top_k']}")
 
-        return jsonify(response), 200
+        return Response(
+            stream_with_context(stream_ranking(
+                documents, params['job_description'], params['top_k'], start_time)),
+            mimetype='application/x-ndjson')
 
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
@@ -131,82 +124,149 @@ def rank_resumes_upload_endpoint():
         )), 500
 
 
-@app.route('/rank_resumes', methods=['POST'])
-def rank_resumes_endpoint():
+@app.route('/rank_resumes_multi', methods=['POST'])
+def rank_resumes_multi_endpoint():
+    """Rank one resume pool against many job descriptions"""
 
     start_time = time.time()
 
     try:
-        # Get request data
-        data = request.json
+        if request.files:
+            params, error = parse_multi_params(
+                request.form.getlist('job_descriptions'), request.form.get('top_k', DEFAULT_TOP_K))
+            if error:
+                body, status = error
+                return jsonify(body), status
+
+            files = request.files.getlist('resumes')
+            if not files:
+                return jsonify(format_error_response("No resume files provided")), 400
+            if len(files) > MAX_RESUMES_PER_REQUEST:
+                return jsonify(format_error_response(
+                    f"Too many resumes (maximum {MAX_RESUMES_PER_REQUEST})")), 400
+
+            params['documents'] = uploaded_file_documents(files)
+        else:
+            params, error = parse_multi_json(request.json or {})
+            if error:
+                body, status = error
+                return jsonify(body), status
+
+        body, status = rank_multi_documents(start_time=start_time, **params)
+        return jsonify(body), status
 
-        # Validate request
-        is_valid, error_message = validate_request(data)
-        if not is_valid:
-            logger.warning(f"Invalid request: {error_message}")
-            return jsonify(format_error_response(error_message))
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-        # Extract parameters
-        job_description = data['job_description']
-        resumes = data['resumes']
-        top_k = data.get('top_k', DEFAULT_TOP_K)
 
-        # Validate top_k
-        if not isinstance(top_k, int) or top_k < 1:
-            return jsonify(format_error_response("'top_k' must be a positive integer"))
+@app.route('/corpus/search', methods=['POST'])
+def corpus_search_endpoint():
 
-        if top_k > len(resumes):
-            top_k = len(resumes)
+    start_time = time.time()
 
-        logger.info(
-            f"Processing {len(resumes)} resumes, returning top {top_k}")
+    try:
+        body, status = corpus_search_request(request.json or {}, start_time)
+        return jsonify(body), status
 
-        # Process resumes
-        resumes_data = []
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-        for i, resume in enumerate(resumes):
-            try:
-                file_base64 = resume['file_base64']
-                file_type = resume.get('file_type', 'pdf')
 
-                # Decode base64
-                file_bytes = base64.b64decode(file_base64)
+@app.route('/corpus/resumes', methods=['POST'])
+def corpus_ingest_endpoint():
+    """Add resumes to the corpus (multipart 'resumes' files or JSON base64)"""
 
-                # Extract text
-                text = extract_text(file_bytes, file_type)
+    start_time = time.time()
 
-                if not text or len(text.strip()) < 50:
-                    logger.warning(f"Resume {i} has insufficient text content")
-                    continue
+    try:
+        if request.files:
+            files = request.files.getlist('resumes')
+            if not files:
+                return jsonify(format_error_response("No resume files provided")), 400
+            if len(files) > MAX_INGEST_PER_REQUEST:
+                return jsonify(format_error_response(
+                    f"Too many resumes (maximum {MAX_INGEST_PER_REQUEST})")), 400
+            documents = uploaded_file_documents(files)
+        else:
+            documents, error = parse_ingest_json(request.json or {})
+            if error:
+                body, status = error
+                return jsonify(body), status
+
+        body, status = ingest_documents(documents, start_time)
+        return jsonify(body), status
 
-                resumes_data.append({
-                    'index': i,
-                    'text': text,
-                    'file_type': file_type
-                })
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-            except Exception as e:
-                logger.error(f"Error processing resume {i}: {str(e)}")
-                continue
 
-        if not resumes_data:
-            return jsonify(format_error_response(
-                "No valid resumes could be processed. Please check file formats and content."
-            ))
+@app.route('/corpus/resumes/<int:resume_id>', methods=['DELETE'])
+def corpus_delete_endpoint(resume_id):
 
-        # Rank resumes
-        ranked_results = rank_resumes(resumes_data, job_description, top_k)
+    try:
+        body, status = delete_corpus_resume(resume_id)
+        return jsonify(body), status
 
-        # Calculate processing time
-        processing_time = round(time.time() - start_time, 2)
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_job_endpoint():
+    """Queue a background ranking job (multipart 'resumes' files or JSON S3 prefix)"""
+
+    try:
+        if request.files:
+            params, error = parse_upload_form(request.form)
+            if error:
+                body, status = error
+                return jsonify(body), status
+
+            files = request.files.getlist('resumes')
+            if not files:
+                return jsonify(format_error_response("No resume files provided")), 400
+            if len(files) > MAX_RESUMES_PER_JOB:
+                return jsonify(format_error_response(
+                    f"Too many resumes (maximum {MAX_RESUMES_PER_JOB})")), 400
+
+            body, status = submit_upload_job(files, params)
+        else:
+            body, status = submit_s3_job(request.get_json(silent=True))
+
+        return jsonify(body), status
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify(format_error_response(
+            f"Internal server error: {str(e)}"
+        )), 500
 
-        logger.info(f"Request completed in {processing_time}s")
 
-        # Format response
-        response = format_success_response(ranked_results, len(resumes_data))
-        response['processing_time_seconds'] = processing_time
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id):
 
-        return jsonify(response), 200
+    body, status = job_status(job_id)
+    return jsonify(body), status
+
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result_endpoint(job_id):
+
+    try:
+        body, status = job_result(job_id)
+        return jsonify(body), status
 
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
@@ -0,0 +1,365 @@
+"""
+ASGI serving mode for the ranking API (Starlette + uvicorn).
+
+Request bodies and uploads are read without blocking the event loop;
+extraction, NER and embedding run on a bounded thread pool (extraction
+fans out further to the process pool), and so does each step of the
+streaming response. Every endpoint of the Flask app is served here with
+the same contract: ranking, /rank_resumes_multi, /corpus/* and /jobs.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from config import (
+    ASGI_WORKER_THREADS, DEFAULT_TOP_K, MAX_INGEST_PER_REQUEST, MAX_RESUMES_PER_JOB,
+    MAX_RESUMES_PER_REQUEST
+)
+from extractor import get_text_cache_stats
+from resume_sources import ResumeDocument, detect_file_type
+from service import (
+    warmup_models, parse_upload_form, rank_uploaded_documents, rank_json_request,
+    parse_stream_json, stream_ranking, parse_multi_params, parse_multi_json, rank_multi_documents,
+    corpus_search_request, parse_ingest_json, ingest_documents, delete_corpus_resume,
+    submit_s3_job, submit_upload_job, job_status, job_result
+)
+from utils import format_error_response, logger
+
+# CPU-bound work (extraction, inference) runs here, off the event loop
+_executor = ThreadPoolExecutor(
+    max_workers=ASGI_WORKER_THREADS, thread_name_prefix="resume-ml")
+
+
+async def run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: func(*args, **kwargs))
+
+
+async def iterate_blocking(generator):
+    """
+    Drive a sync generator on the bounded pool, one item per step.
+    Starlette would otherwise iterate it on anyio's default thread pool,
+    outside ASGI_WORKER_THREADS.
+    """
+    done = object()
+    try:
+        while True:
+            item = await run_blocking(next, generator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        # Runs the generator's cleanup when the client disconnects early
+        await run_blocking(generator.close)
+
+
+async def read_upload_documents(files):
+    """Async counterpart of resume_sources.uploaded_file_documents"""
+
+    documents = []
+
+    for i, file in enumerate(files):
+        try:
+            if isinstance(file, str) or not file.filename:
+                logger.warning(f"Resume {i}: Empty file")
+                continue
+
+            filename = file.filename.lower()
+            file_type = detect_file_type(filename)
+            if file_type is None:
+                logger.warning(
+                    f"Resume {i}: Unsupported file type - {filename}")
+                continue
+
+            file_bytes = await file.read()
+
+            if len(file_bytes) == 0:
+                logger.warning(f"Resume {i}: Empty file content")
+                continue
+
+            documents.append(ResumeDocument(i, file_bytes, file_type, filename))
+
+        except Exception as e:
+            logger.error(f"Error processing resume {i}: {str(e)}")
+            continue
+
+    return documents
+
+
+class SpoolableUpload:
+    """A Starlette upload with the Werkzeug-style .save() that JobQueue.submit_files uses"""
+
+    def __init__(self, upload):
+        self.filename = upload.filename
+        self._file = upload.file
+
+    def save(self, path):
+        self._file.seek(0)
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(self._file, f)
+
+
+def is_multipart(request):
+    return request.headers.get('content-type', '').startswith('multipart/form-data')
+
+
+def json_response(result):
+    body, status = result
+    return JSONResponse(body, status_code=status)
+
+
+def internal_error(e):
+    logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+    return JSONResponse(format_error_response(
+        f"Internal server error: {str(e)}"
+    ), status_code=500)
+
+
+async def health_check(request):
+    return JSONResponse({
+        "status": "healthy",
+        "service": "Resume Ranking API",
+        "version": "2.0",
+        "text_cache": get_text_cache_stats()
+    }, status_code=200)
+
+
+async def rank_resumes_upload_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        form = await request.form()
+
+        params, error = parse_upload_form(form)
+        if error:
+            return json_response(error)
+
+        files = form.getlist('resumes')
+
+        if not files or len(files) == 0:
+            return JSONResponse(format_error_response("No resume files provided"), status_code=400)
+
+        logger.info(
+            f"Processing {len(files)} uploaded resumes, returning top {params['top_k']}")
+
+        documents = await read_upload_documents(files)
+
+        return json_response(await run_blocking(
+            rank_uploaded_documents, documents, start_time=start_time, **params))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def rank_resumes_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        data = await request.json()
+
+        return json_response(await run_blocking(rank_json_request, data, start_time))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def rank_resumes_stream_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        if is_multipart(request):
+            form = await request.form()
+
+            params, error = parse_upload_form(form)
+            if error:
+                return json_response(error)
+
+            files = form.getlist('resumes')
+            if not files:
+                return JSONResponse(format_error_response("No resume files provided"), status_code=400)
+
+            documents = await read_upload_documents(files)
+        else:
+            params, error = parse_stream_json(await request.json())
+            if error:
+                return json_response(error)
+
+            documents = params['documents']
+
+        logger.info(
+            f"Streaming ranking of {len(documents)} resumes, returning top {params['top_k']}")
+
+        return StreamingResponse(
+            iterate_blocking(stream_ranking(
+                documents, params['job_description'], params['top_k'], start_time)),
+            media_type='application/x-ndjson')
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def rank_resumes_multi_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        if is_multipart(request):
+            form = await request.form()
+
+            params, error = parse_multi_params(
+                form.getlist('job_descriptions'), form.get('top_k', DEFAULT_TOP_K))
+            if error:
+                return json_response(error)
+
+            files = form.getlist('resumes')
+            if not files:
+                return JSONResponse(format_error_response("No resume files provided"), status_code=400)
+            if len(files) > MAX_RESUMES_PER_REQUEST:
+                return JSONResponse(format_error_response(
+                    f"Too many resumes (maximum {MAX_RESUMES_PER_REQUEST})"), status_code=400)
+
+            params['documents'] = await read_upload_documents(files)
+        else:
+            params, error = parse_multi_json(await request.json())
+            if error:
+                return json_response(error)
+
+        return json_response(await run_blocking(
+            rank_multi_documents, start_time=start_time, **params))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def corpus_search_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        data = await request.json()
+        return json_response(await run_blocking(corpus_search_request, data, start_time))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def corpus_ingest_endpoint(request):
+
+    start_time = time.time()
+
+    try:
+        if is_multipart(request):
+            files = (await request.form()).getlist('resumes')
+            if not files:
+                return JSONResponse(format_error_response("No resume files provided"), status_code=400)
+            if len(files) > MAX_INGEST_PER_REQUEST:
+                return JSONResponse(format_error_response(
+                    f"Too many resumes (maximum {MAX_INGEST_PER_REQUEST})"), status_code=400)
+            documents = await read_upload_documents(files)
+        else:
+            documents, error = parse_ingest_json(await request.json())
+            if error:
+                return json_response(error)
+
+        return json_response(await run_blocking(ingest_documents, documents, start_time))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def corpus_delete_endpoint(request):
+
+    try:
+        return json_response(await run_blocking(
+            delete_corpus_resume, request.path_params['resume_id']))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def submit_job_endpoint(request):
+
+    try:
+        if is_multipart(request):
+            form = await request.form()
+
+            params, error = parse_upload_form(form)
+            if error:
+                return json_response(error)
+
+            files = form.getlist('resumes')
+            if not files:
+                return JSONResponse(format_error_response("No resume files provided"), status_code=400)
+            if len(files) > MAX_RESUMES_PER_JOB:
+                return JSONResponse(format_error_response(
+                    f"Too many resumes (maximum {MAX_RESUMES_PER_JOB})"), status_code=400)
+
+            # Plain text parts are skipped by submit_files like empty uploads
+            uploads = [None if isinstance(f, str) else SpoolableUpload(f) for f in files]
+            return json_response(await run_blocking(submit_upload_job, uploads, params))
+
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        return json_response(await run_blocking(submit_s3_job, data))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+async def job_status_endpoint(request):
+    return json_response(job_status(request.path_params['job_id']))
+
+
+async def job_result_endpoint(request):
+
+    try:
+        return json_response(await run_blocking(job_result, request.path_params['job_id']))
+
+    except Exception as e:
+        return internal_error(e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await run_blocking(warmup_models)
+    yield
+    _executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/rank_resumes_upload', rank_resumes_upload_endpoint, methods=['POST']),
+        Route('/rank_resumes', rank_resumes_endpoint, methods=['POST']),
+        Route('/rank_resumes_stream', rank_resumes_stream_endpoint, methods=['POST']),
+        Route('/rank_resumes_multi', rank_resumes_multi_endpoint, methods=['POST']),
+        Route('/corpus/search', corpus_search_endpoint, methods=['POST']),
+        Route('/corpus/resumes', corpus_ingest_endpoint, methods=['POST']),
+        Route('/corpus/resumes/{resume_id:int}', corpus_delete_endpoint, methods=['DELETE']),
+        Route('/jobs', submit_job_endpoint, methods=['POST']),
+        Route('/jobs/{job_id}', job_status_endpoint, methods=['GET']),
+        Route('/jobs/{job_id}/result', job_result_endpoint, methods=['GET']),
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    logger.info("Starting Resume Ranking API (ASGI)...")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
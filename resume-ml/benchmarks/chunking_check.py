@@ -0,0 +1,67 @@
+"""
+Sanity check of section-aware resume chunking.
+
+Splits fixed resume texts with chunking.split_resume_chunks and checks
+section boundaries, the window size, the max-chunks cap and empty
+input. Exits non-zero on the first failed check.
+
+Usage:
+    python benchmarks/chunking_check.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import chunk_resume_texts, split_resume_chunks  # noqa: E402
+
+RESUME = "\n".join([
+    "Jane Doe",
+    "jane.doe@example.com",
+    "SUMMARY",
+    "Backend engineer building data platforms.",
+    "EXPERIENCE",
+    " ".join(f"exp{i}" for i in range(50)),
+    "Skills:",
+    " ".join(f"skill{i}" for i in range(15)),
+    "EDUCATION",
+    "BSc Computer Science",
+])
+
+
+def check(condition, message):
+    if not condition:
+        print(f"FAIL: {message}")
+        sys.exit(1)
+    print(f"ok   {message}")
+
+
+def main():
+    chunks = split_resume_chunks(RESUME, max_chunks=10, chunk_words=20)
+
+    check(all(len(c.split()) <= 20 for c in chunks), "windows hold at most chunk_words words")
+    check(chunks[0].startswith("Jane Doe") and chunks[0].endswith("data platforms."),
+          "short neighbouring sections share a window")
+    check(chunks[1].startswith("EXPERIENCE exp0"),
+          "a section that does not fit starts a new window")
+    check(any(c.startswith("Skills:") for c in chunks),
+          "title-case headers with a colon are section boundaries")
+    check(" ".join(chunks).split() == RESUME.split(), "no words are lost or reordered")
+
+    capped = split_resume_chunks(RESUME, max_chunks=2, chunk_words=20)
+    check(capped == chunks[:2], "only the first max_chunks windows are kept")
+
+    check(split_resume_chunks("", max_chunks=4, chunk_words=20) == [""],
+          "empty text gives one empty chunk")
+    check(split_resume_chunks("  \n\n ", max_chunks=4, chunk_words=20) == ["  \n\n "],
+          "blank text gives one chunk")
+    check(split_resume_chunks("Short resume text", max_chunks=4, chunk_words=20) == ["Short resume text"],
+          "short text is one window")
+
+    all_chunks, offsets = chunk_resume_texts([RESUME, "", "Short resume text"], 10, 20)
+    check(offsets == [0, len(chunks), len(chunks) + 1] and len(all_chunks) == len(chunks) + 2,
+          "offsets mark each resume's first chunk")
+
+
+if __name__ == '__main__':
+    main()
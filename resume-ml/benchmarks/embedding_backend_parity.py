@@ -0,0 +1,103 @@
+"""
+Score parity and speed of the ONNX int8 embedding backend against PyTorch.
+
+Encodes the job description and every resume with both backends and
+compares the job/resume cosine similarities. Exits non-zero if any score
+differs by more than the tolerance. Without arguments it uses the
+fixture job description and resume texts under benchmarks/fixtures.
+
+Usage:
+    python benchmarks/embedding_backend_parity.py
+    python benchmarks/embedding_backend_parity.py --job-description jd.txt \
+        --resumes ./resumes --tolerance 0.02
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SENTENCE_TRANSFORMER_MODEL, ONNX_MODEL_DIR, EMBEDDING_MAX_SEQ_LENGTH  # noqa: E402
+from embedding_backend import TorchEmbeddingBackend, OnnxInt8EmbeddingBackend  # noqa: E402
+from onnx_export import ONNX_INT8  # noqa: E402
+from extractor import extract_texts  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture_texts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line)['text'] for line in f if line.strip()]
+
+
+def load_resume_texts(directory):
+    documents = []
+    for filename in sorted(os.listdir(directory)):
+        file_type = filename.lower().rsplit('.', 1)[-1]
+        if file_type not in ('pdf', 'docx'):
+            continue
+        with open(os.path.join(directory, filename), 'rb') as f:
+            documents.append((f.read(), file_type))
+
+    return [text for text in extract_texts(documents) if text]
+
+
+def timed_scores(backend, job_description, texts, batch_size):
+    # Warm up so graph/session setup is not timed
+    backend.encode([job_description], normalize_embeddings=True)
+
+    start = time.perf_counter()
+    embeddings = backend.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    elapsed = time.perf_counter() - start
+
+    job_embedding = backend.encode([job_description], normalize_embeddings=True)[0]
+    return embeddings @ job_embedding, elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--job-description',
+                            default=os.path.join(FIXTURES, "parity_job_description.txt"),
+                            help="Text file containing the job description")
+    arg_parser.add_argument('--resumes',
+                            help="Directory of PDF/DOCX resumes (default: fixture resume texts)")
+    arg_parser.add_argument('--batch-size', type=int, default=32)
+    arg_parser.add_argument('--tolerance', type=float, default=0.02,
+                            help="Largest allowed absolute difference in cosine similarity")
+    args = arg_parser.parse_args()
+
+    with open(args.job_description, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+
+    if args.resumes:
+        texts = load_resume_texts(args.resumes)
+    else:
+        texts = load_fixture_texts(os.path.join(FIXTURES, "parity_resumes.jsonl"))
+    print(f"Loaded {len(texts)} resumes")
+
+    torch_scores, torch_time = timed_scores(
+        TorchEmbeddingBackend(SENTENCE_TRANSFORMER_MODEL), job_description, texts, args.batch_size)
+    onnx_scores, onnx_time = timed_scores(
+        OnnxInt8EmbeddingBackend(SENTENCE_TRANSFORMER_MODEL, ONNX_MODEL_DIR, EMBEDDING_MAX_SEQ_LENGTH),
+        job_description, texts, args.batch_size)
+
+    diff = np.abs(torch_scores - onnx_scores)
+    same_order = np.array_equal(np.argsort(-torch_scores), np.argsort(-onnx_scores))
+
+    print(f"\n{'backend':>10} {'encode (s)':>11} {'speedup':>8}")
+    print(f"{'torch':>10} {torch_time:>11.2f} {1.0:>8.2f}")
+    print(f"{ONNX_INT8:>10} {onnx_time:>11.2f} {torch_time / onnx_time:>8.2f}")
+    print(f"\nmax |diff| {diff.max():.4f}, mean |diff| {diff.mean():.4f}, "
+          f"same ranking: {same_order}")
+
+    if diff.max() > args.tolerance:
+        print(f"FAIL: scores differ by more than {args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
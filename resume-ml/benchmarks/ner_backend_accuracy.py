@@ -0,0 +1,111 @@
+"""
+Name accuracy and speed of an alternative NER backend against PyTorch.
+
+Parses the fixture resume headers with parser.extract_entities_batch,
+once with the current fp32 pipeline and once with the candidate
+backend/model swapped in, so names go through the same NER and
+fallbacks as in production. Compares them with the expected names and
+with each other, and exits non-zero if the candidate's accuracy falls
+more than the tolerance below the baseline.
+
+Every header goes through NER by default ("ner" mode). With
+--mode tiered, headers the cheap heuristics are sure of skip NER, which
+measures the end-to-end effect but hides most backend differences.
+
+Usage:
+    python benchmarks/ner_backend_accuracy.py --backend onnx-int8
+    python benchmarks/ner_backend_accuracy.py --backend onnx-int8 --mode tiered
+    python benchmarks/ner_backend_accuracy.py --backend torch \
+        --model elastic/distilbert-base-cased-finetuned-conll03-english
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser  # noqa: E402
+from config import NER_MODEL, NER_BATCH_SIZE  # noqa: E402
+from onnx_export import TORCH  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "resume_headers.jsonl")
+
+
+def load_fixtures(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def timed_names(ner, headers, batch_size, repeats):
+    # The parser's lazily loaded pipeline is replaced by the one under test
+    parser._ner_pipeline = ner
+
+    # Warm up so session/graph setup is not timed
+    ner(headers[:1])
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        results = parser.extract_entities_batch(headers, batch_size=batch_size)
+    elapsed = (time.perf_counter() - start) / repeats
+
+    return [parsed["name"] for parsed in results], elapsed
+
+
+def same_name(a, b):
+    return a is not None and b is not None and a.casefold().split() == b.casefold().split()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--backend', default="onnx-int8",
+                            help="Candidate NER backend (torch or onnx-int8)")
+    arg_parser.add_argument('--model', default=NER_MODEL,
+                            help="Candidate NER model")
+    arg_parser.add_argument('--fixtures', default=FIXTURES,
+                            help="JSONL file of {\"header\", \"name\"} records")
+    arg_parser.add_argument('--mode', choices=["ner", "tiered"], default="ner",
+                            help="Name extraction mode (default: every header goes through NER)")
+    arg_parser.add_argument('--batch-size', type=int, default=NER_BATCH_SIZE)
+    arg_parser.add_argument('--repeats', type=int, default=5)
+    arg_parser.add_argument('--tolerance', type=float, default=0.05,
+                            help="Largest allowed drop in accuracy against the baseline")
+    args = arg_parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    headers = [f['header'] for f in fixtures]
+    # Overrides the NAME_EXTRACTION_MODE setting for this run
+    parser.NAME_EXTRACTION_MODE = args.mode
+    print(f"Loaded {len(fixtures)} resume headers (name extraction mode: {args.mode})")
+
+    baseline_names, baseline_time = timed_names(
+        parser.load_ner_pipeline(TORCH, NER_MODEL), headers, args.batch_size, args.repeats)
+    candidate_names, candidate_time = timed_names(
+        parser.load_ner_pipeline(args.backend, args.model), headers, args.batch_size, args.repeats)
+
+    baseline_accuracy = sum(
+        same_name(n, f['name']) for n, f in zip(baseline_names, fixtures)) / len(fixtures)
+    candidate_accuracy = sum(
+        same_name(n, f['name']) for n, f in zip(candidate_names, fixtures)) / len(fixtures)
+    agreement = sum(
+        n == m for n, m in zip(baseline_names, candidate_names)) / len(fixtures)
+
+    print(f"\n{'backend':>40} {'accuracy':>9} {'ms/header':>10} {'speedup':>8}")
+    print(f"{TORCH + ' ' + NER_MODEL:>40} {baseline_accuracy:>9.2f} "
+          f"{baseline_time * 1000 / len(headers):>10.2f} {1.0:>8.2f}")
+    print(f"{args.backend + ' ' + args.model:>40} {candidate_accuracy:>9.2f} "
+          f"{candidate_time * 1000 / len(headers):>10.2f} {baseline_time / candidate_time:>8.2f}")
+    print(f"\nAgreement with baseline: {agreement:.2f}")
+
+    for fixture, baseline, candidate in zip(fixtures, baseline_names, candidate_names):
+        if baseline != candidate:
+            print(f"  expected {fixture['name']!r}: baseline {baseline!r}, candidate {candidate!r}")
+
+    if candidate_accuracy < baseline_accuracy - args.tolerance:
+        print(f"FAIL: accuracy dropped by more than {args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
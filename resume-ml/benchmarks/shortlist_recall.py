@@ -0,0 +1,79 @@
+"""
+Recall of two-stage ranking against the full ranking.
+
+For each shortlist size M, ranks the pool with the prefilter enabled and
+reports how many of the full ranking's top-k candidates survive, along
+with the wall time of both runs.
+
+Usage:
+    python benchmarks/shortlist_recall.py --job-description jd.txt \
+        --resumes ./resumes --top-k 10 --sizes 10,20,50,100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Cached embeddings would make every run after the first look free
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "false")
+
+from extractor import extract_texts  # noqa: E402
+from ranker import rank_resumes  # noqa: E402
+
+
+def load_resumes(directory):
+    documents, filenames = [], []
+    for filename in sorted(os.listdir(directory)):
+        file_type = filename.lower().rsplit('.', 1)[-1]
+        if file_type not in ('pdf', 'docx'):
+            continue
+        with open(os.path.join(directory, filename), 'rb') as f:
+            documents.append((f.read(), file_type))
+        filenames.append(filename)
+
+    texts = extract_texts(documents)
+    return [{'index': i, 'text': text, 'filename': filenames[i]}
+            for i, text in enumerate(texts) if text]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--job-description', required=True,
+                            help="Text file containing the job description")
+    arg_parser.add_argument('--resumes', required=True,
+                            help="Directory of PDF/DOCX resumes")
+    arg_parser.add_argument('--top-k', type=int, default=10)
+    arg_parser.add_argument('--sizes', default="10,20,50,100",
+                            help="Comma-separated shortlist sizes to try")
+    args = arg_parser.parse_args()
+
+    with open(args.job_description, 'r', encoding='utf-8') as f:
+        job_description = f.read()
+
+    resumes_data = load_resumes(args.resumes)
+    print(f"Loaded {len(resumes_data)} resumes")
+
+    # Warm up models so the first timing is comparable
+    rank_resumes(resumes_data[:1], job_description, 1)
+
+    start = time.perf_counter()
+    full = rank_resumes(resumes_data, job_description, args.top_k, shortlist_size=None)
+    full_time = time.perf_counter() - start
+    full_top = {r['index'] for r in full}
+
+    print(f"\n{'M':>6} {'recall@k':>9} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'full':>6} {1.0:>9.2f} {full_time:>9.2f} {1.0:>8.2f}")
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        start = time.perf_counter()
+        shortlisted = rank_resumes(
+            resumes_data, job_description, args.top_k, shortlist_size=size)
+        elapsed = time.perf_counter() - start
+
+        recall = len(full_top & {r['index'] for r in shortlisted}) / max(len(full_top), 1)
+        print(f"{size:>6} {recall:>9.2f} {elapsed:>9.2f} {full_time / elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
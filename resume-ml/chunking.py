@@ -0,0 +1,81 @@
+"""
+Section-aware chunking of long resumes.
+
+The sentence encoder only sees its first EMBEDDING_MAX_SEQ_LENGTH tokens,
+so a multi-page resume is mostly ignored when embedded whole. Resumes are
+split at section headers (SKILLS, EXPERIENCE, ...) into windows of at most
+chunk_words words; short neighbouring sections share a window and long
+sections are split. Only the first max_chunks windows are kept, so the
+encoding cost is bounded per resume.
+"""
+import re
+from typing import List, Tuple
+
+from parser import IGNORED_HEADERS
+
+_WORD = re.compile(r'\S+')
+
+
+def is_section_header(line: str) -> bool:
+    """A known section name, or a short all-caps line such as 'OPEN SOURCE'"""
+    stripped = line.strip().rstrip(':').strip()
+    if not stripped:
+        return False
+    if stripped.upper() in IGNORED_HEADERS:
+        return True
+    return stripped.isupper() and len(stripped.split()) <= 4 and any(c.isalpha() for c in stripped)
+
+
+def split_sections(text: str) -> List[List[str]]:
+    """Lines grouped by section, each section starting at its header"""
+    sections = [[]]
+    for line in text.split('\n'):
+        if is_section_header(line) and sections[-1]:
+            sections.append([])
+        if line.strip():
+            sections[-1].append(line.strip())
+    return [section for section in sections if section]
+
+
+def split_resume_chunks(text: str, max_chunks: int, chunk_words: int) -> List[str]:
+    """Up to max_chunks windows of at most chunk_words words each"""
+
+    chunks = []
+    window: List[str] = []
+
+    def flush():
+        if window:
+            chunks.append(' '.join(window))
+            window.clear()
+
+    for section in split_sections(text):
+        words = _WORD.findall(' '.join(section))
+
+        # Start a fresh window when the section does not fit in the current one
+        if len(window) + len(words) > chunk_words:
+            flush()
+
+        for start in range(0, len(words), chunk_words):
+            window.extend(words[start:start + chunk_words])
+            if len(window) >= chunk_words:
+                flush()
+
+        if len(chunks) >= max_chunks:
+            break
+
+    flush()
+    return chunks[:max_chunks] or [text]
+
+
+def chunk_resume_texts(
+    resume_texts: List[str],
+    max_chunks: int,
+    chunk_words: int
+) -> Tuple[List[str], List[int]]:
+    """All chunks of all resumes, in resume order, and the offset of each resume's first chunk"""
+
+    chunks, offsets = [], []
+    for text in resume_texts:
+        offsets.append(len(chunks))
+        chunks.extend(split_resume_chunks(text, max_chunks, chunk_words))
+    return chunks, offsets
@@ -1,12 +1,125 @@
+import os
 
 SENTENCE_TRANSFORMER_MODEL = "all-MiniLM-L6-v2"
-NER_MODEL = "dslim/bert-base-NER"
+# A distilled token classifier (e.g. "elastic/distilbert-base-cased-finetuned-conll03-english")
+# can replace BERT-base; any model tagging PER entities works
+NER_MODEL = os.environ.get("NER_MODEL", "dslim/bert-base-NER")
+
+# Embedding backend: "torch" (fp32 SentenceTransformer) or "onnx-int8"
+# (ONNX Runtime with dynamic int8 quantization; needs optimum[onnxruntime])
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get(
+    "ONNX_MODEL_DIR", "/tmp/resume-ml/onnx")  # Exported models are reused from here
+EMBEDDING_MAX_SEQ_LENGTH = int(os.environ.get(
+    "EMBEDDING_MAX_SEQ_LENGTH", "256"))  # all-MiniLM-L6-v2 truncates beyond this
+
+# Long resumes: encode up to RESUME_MAX_CHUNKS section-aware windows per
+# resume and pool their scores ("max" or "mean"). 0 embeds the whole text,
+# which the model truncates to EMBEDDING_MAX_SEQ_LENGTH tokens
+RESUME_MAX_CHUNKS = int(os.environ.get("RESUME_MAX_CHUNKS", "0"))
+RESUME_CHUNK_WORDS = 160  # About one model input of word pieces
+RESUME_CHUNK_POOLING = os.environ.get("RESUME_CHUNK_POOLING", "max")
+
+# NER backend: "torch" (transformers pipeline) or "onnx-int8" (same model
+# exported to ONNX_MODEL_DIR and quantized; needs optimum[onnxruntime])
+NER_BACKEND = os.environ.get("NER_BACKEND", "torch")
 
 # API Configuration
 MAX_RESUMES_PER_REQUEST = 50
+MAX_RESUME_IDS_PER_REQUEST = 2000  # Stored corpus resumes need no extraction
+MAX_INGEST_PER_REQUEST = 200
+MAX_JOB_DESCRIPTIONS_PER_REQUEST = 100  # /rank_resumes_multi
 DEFAULT_TOP_K = 10
 REQUEST_TIMEOUT = 300  # 5 minutes
 
+# Background ranking jobs (POST /jobs): no request timeout or 50-resume cap
+MAX_RESUMES_PER_JOB = int(os.environ.get("MAX_RESUMES_PER_JOB", "10000"))
+JOBS_DIR = os.environ.get("JOBS_DIR", "/tmp/resume-ml/jobs")  # Spooled uploads and results
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+JOB_RETENTION_SECONDS = int(os.environ.get(
+    "JOB_RETENTION_SECONDS", "86400"))  # Finished jobs are then deleted
+
+# ASGI server (asgi.py): threads running extraction and inference off the event loop
+ASGI_WORKER_THREADS = int(os.environ.get("ASGI_WORKER_THREADS", "4"))
+
+# Inference Configuration
+EMBEDDING_BATCH_SIZE = 32  # Resumes encoded per forward pass
+NER_BATCH_SIZE = 16  # Resume headers tagged per NER forward pass
+STREAM_BATCH_SIZE = int(os.environ.get(
+    "STREAM_BATCH_SIZE", "8"))  # Resumes scored per step by /rank_resumes_stream
+
+# Micro-batching of embedding calls across concurrent requests
+INFERENCE_SCHEDULER_ENABLED = os.environ.get(
+    "INFERENCE_SCHEDULER_ENABLED", "false").lower() == "true"
+INFERENCE_MAX_BATCH_SIZE = int(os.environ.get(
+    "INFERENCE_MAX_BATCH_SIZE", "64"))  # Texts per shared forward pass
+INFERENCE_MAX_WAIT_MS = float(os.environ.get(
+    "INFERENCE_MAX_WAIT_MS", "5"))  # Wait for other requests after the first
+
+# Name Extraction
+# "tiered": header/email heuristics first, NER only for ambiguous resumes
+# "ner": always run NER first (heuristics are fallbacks only)
+NAME_EXTRACTION_MODE = os.environ.get("NAME_EXTRACTION_MODE", "tiered")
+NAME_HEURISTIC_MIN_CONFIDENCE = 0.8
+PRELOAD_NER_MODEL = os.environ.get(
+    "PRELOAD_NER_MODEL", str(NAME_EXTRACTION_MODE == "ner")).lower() == "true"
+
+# Embedding Cache (content-addressed, persisted across requests)
+EMBEDDING_CACHE_ENABLED = os.environ.get(
+    "EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DIR = os.environ.get(
+    "EMBEDDING_CACHE_DIR", "/tmp/resume-ml/embeddings")
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+
+# Parsed job descriptions kept for reuse across requests
+JOB_PROFILE_CACHE_SIZE = 256
+
+# Extracted Text Cache (keyed by file digest)
+TEXT_CACHE_MAX_ENTRIES = int(os.environ.get("TEXT_CACHE_MAX_ENTRIES", "512"))
+TEXT_CACHE_DIR = os.environ.get("TEXT_CACHE_DIR", "")  # Empty disables disk tier
+
+# Parallel Extraction
+EXTRACTION_WORKERS = int(os.environ.get(
+    "EXTRACTION_WORKERS", os.cpu_count() or 1))  # 1 or less extracts sequentially
+EXTRACTION_TIMEOUT = int(os.environ.get(
+    "EXTRACTION_TIMEOUT", "60"))  # Seconds per file
+
+# S3 resume fetching
+S3_FETCH_CONCURRENCY = int(os.environ.get(
+    "S3_FETCH_CONCURRENCY", "16"))  # Downloads in flight (and HTTP pool size)
+S3_ENDPOINT_URL = os.environ.get(
+    "S3_ENDPOINT_URL") or None  # e.g. a local MinIO or moto server
+S3_MANIFEST_ENABLED = os.environ.get(
+    "S3_MANIFEST_ENABLED", "true").lower() == "true"  # Reuse parsed objects by ETag
+S3_MANIFEST_DIR = os.environ.get(
+    "S3_MANIFEST_DIR", "/tmp/resume-ml/s3_manifests")
+S3_MANIFEST_SIDECAR_KEY = os.environ.get(
+    "S3_MANIFEST_SIDECAR_KEY", "")  # Relative to the prefix; empty disables
+S3_MANIFEST_FAILURE_TTL = int(os.environ.get(
+    "S3_MANIFEST_FAILURE_TTL", "3600"))  # Seconds before unreadable objects are retried
+
+# Two-stage ranking: cheap prefilter before NER and embeddings
+PREFILTER_SHORTLIST_SIZE = None  # Default shortlist size (None disables)
+PREFILTER_WEIGHTS = {
+    "tfidf_similarity": 0.5,
+    "skills_match": 0.5
+}
+
+# Standing resume corpus (ANN search)
+CORPUS_DIR = os.environ.get(
+    "CORPUS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus_data"))
+CORPUS_INITIAL_CAPACITY = 10000  # Index grows automatically beyond this
+CORPUS_HNSW_M = 16
+CORPUS_HNSW_EF_CONSTRUCTION = 200
+CORPUS_HNSW_EF_SEARCH = 128
+CORPUS_RERANK_CANDIDATES = 200  # Nearest neighbours re-ranked per query
+# The HNSW index file is rewritten after this many logged changes or seconds;
+# changes in between are replayed from SQLite after a crash
+CORPUS_INDEX_SAVE_OPS = int(os.environ.get("CORPUS_INDEX_SAVE_OPS", "1000"))
+CORPUS_INDEX_SAVE_INTERVAL = float(os.environ.get("CORPUS_INDEX_SAVE_INTERVAL", "300"))
+
 # Scoring Weights
 WEIGHTS = {
     "semantic_similarity": 0.5,  # 50% weight to overall semantic match
@@ -14,7 +127,12 @@ WEIGHTS = {
     "experience_match": 0.2      # 20% weight to experience relevance
 }
 
-# Comprehensive Skills Database (expandable)
+# Skill taxonomy with aliases (see data/skill_taxonomy.tsv for the format)
+SKILL_TAXONOMY_PATH = os.environ.get(
+    "SKILL_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.tsv"))
+
+# Comprehensive Skills Database (fallback when no taxonomy file is found)
 SKILL_KEYWORDS = [
     # Programming Languages
     "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "php",
@@ -0,0 +1,489 @@
+"""
+Standing resume corpus: ingest once, query many times.
+
+Parsed records live in SQLite and MiniLM embeddings in an HNSW index
+(hnswlib, cosine space), both persisted under CORPUS_DIR. Queries
+retrieve approximate nearest neighbours of the job description and
+re-rank them with the regular composite score.
+
+The corpus records how its vectors were built (model, backend and
+chunking mode, see ranker.resume_embedding_signature) and refuses to
+open under different settings, since mixed vectors make scores
+meaningless. In chunked mode each resume has one mean-pooled vector.
+
+Rewriting the whole HNSW file on every change is slow for a large
+corpus, so adds and deletes are logged in SQLite (index_log, with the
+vectors) in the same transaction as the records. The index file is
+saved once CORPUS_INDEX_SAVE_OPS changes or CORPUS_INDEX_SAVE_INTERVAL
+seconds have accumulated and at exit, which clears the log; a log left
+by a crash is replayed into the index on open.
+
+Bulk ingestion from a directory:
+    python corpus.py ingest ./resumes
+"""
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+import hnswlib
+import numpy as np
+
+from config import (
+    CORPUS_DIR, CORPUS_INITIAL_CAPACITY, CORPUS_HNSW_M, CORPUS_HNSW_EF_CONSTRUCTION,
+    CORPUS_HNSW_EF_SEARCH, CORPUS_RERANK_CANDIDATES, CORPUS_INDEX_SAVE_OPS,
+    CORPUS_INDEX_SAVE_INTERVAL, DEFAULT_TOP_K, SENTENCE_TRANSFORMER_MODEL
+)
+from job_profile import build_job_profile
+from parser import extract_entities_batch
+from ranker import (
+    get_semantic_model, get_job_embedding, encode_resume_texts, resume_embedding_signature,
+    score_parsed_batch, select_top_k, build_result
+)
+from utils import logger
+
+INDEX_FILENAME = "resumes.hnsw"
+DB_FILENAME = "resumes.db"
+
+
+# Corpora created before the signature was recorded hold whole-text PyTorch vectors
+LEGACY_EMBEDDING_SIGNATURE = f"{SENTENCE_TRANSFORMER_MODEL}|whole"
+
+
+class CorpusSettingsMismatch(Exception):
+    """The corpus was built with different embedding settings"""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResumeCorpus:
+    """Parsed resumes in SQLite, their embeddings in an HNSW index keyed by row id"""
+
+    def __init__(self, directory: str, dim: int, embedding_signature: str):
+        self.directory = directory
+        self.dim = dim
+        self.embedding_signature = embedding_signature
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILENAME)
+
+        self._db = sqlite3.connect(
+            os.path.join(directory, DB_FILENAME), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " text_hash TEXT NOT NULL,"
+            " filename TEXT,"
+            " entities TEXT NOT NULL,"
+            " created_at REAL NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_resumes_text_hash ON resumes (text_hash)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Index changes not yet in the saved HNSW file; embedding is NULL for deletes
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS index_log ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " resume_id INTEGER NOT NULL,"
+            " embedding BLOB)")
+        self._db.commit()
+        self._check_embedding_signature()
+
+        self._index = hnswlib.Index(space='cosine', dim=dim)
+        if os.path.exists(self._index_path):
+            self._index.load_index(self._index_path, allow_replace_deleted=True)
+            logger.info(
+                f"Loaded corpus index with {self._count()} resumes from {directory}")
+        else:
+            self._index.init_index(
+                max_elements=CORPUS_INITIAL_CAPACITY,
+                ef_construction=CORPUS_HNSW_EF_CONSTRUCTION,
+                M=CORPUS_HNSW_M,
+                allow_replace_deleted=True)
+        self._index.set_ef(CORPUS_HNSW_EF_SEARCH)
+
+        self._pending_ops = 0
+        self._last_save = time.time()
+        self._replay_index_log()
+
+    def _check_embedding_signature(self):
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'embedding_signature'").fetchone()
+        if row is None:
+            has_resumes = self._db.execute("SELECT 1 FROM resumes LIMIT 1").fetchone()
+            stored = LEGACY_EMBEDDING_SIGNATURE if has_resumes else self.embedding_signature
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('embedding_signature', ?)", (stored,))
+            self._db.commit()
+        else:
+            stored = row[0]
+
+        if stored != self.embedding_signature:
+            self._db.close()
+            raise CorpusSettingsMismatch(
+                f"Corpus in {self.directory} holds '{stored}' embeddings but the service "
+                f"produces '{self.embedding_signature}'. Restore the embedding settings, or "
+                f"point CORPUS_DIR at a new directory and re-ingest the resumes.")
+
+    def _replay_index_log(self):
+        """Apply changes logged after the last index save, e.g. before a crash"""
+        rows = self._db.execute(
+            "SELECT resume_id, embedding FROM index_log ORDER BY seq").fetchall()
+        if not rows:
+            return
+
+        logger.info(f"Replaying {len(rows)} corpus index changes from the log")
+        for resume_id, embedding in rows:
+            if embedding is None:
+                try:
+                    self._index.mark_deleted(resume_id)
+                except RuntimeError:
+                    pass  # Already deleted in the saved index
+            else:
+                self._ensure_capacity(1)
+                self._index.add_items(
+                    np.frombuffer(embedding, dtype=np.float32)[np.newaxis],
+                    [resume_id], replace_deleted=True)
+        self._save()
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+    def _count(self):
+        return self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def _ensure_capacity(self, count):
+        # Grow geometrically so incremental adds stay cheap
+        needed = self._index.get_current_count() + count
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+
+    def add(self, records: List[Dict[str, Any]], embeddings: np.ndarray) -> List[Tuple[int, bool]]:
+        """
+        Insert parsed records with their embeddings, skipping any whose text
+        hash is already stored. Returns (id, added) per record, where
+        duplicates carry the id of the existing resume.
+        """
+        if not records:
+            return []
+
+        with self._lock:
+            try:
+                existing = self._find_by_hashes({r['text_hash'] for r in records})
+
+                now = time.time()
+                results = []
+                new_ids, new_rows = [], []
+                for row, record in enumerate(records):
+                    if record['text_hash'] in existing:
+                        results.append((existing[record['text_hash']], False))
+                        continue
+
+                    cursor = self._db.execute(
+                        "INSERT INTO resumes (text_hash, filename, entities, created_at)"
+                        " VALUES (?, ?, ?, ?)",
+                        (record['text_hash'], record.get('filename'),
+                         json.dumps(record['entities']), now))
+                    # Later copies in the same batch are duplicates too
+                    existing[record['text_hash']] = cursor.lastrowid
+                    results.append((cursor.lastrowid, True))
+                    new_ids.append(cursor.lastrowid)
+                    new_rows.append(row)
+
+                if new_ids:
+                    vectors = np.asarray(embeddings, dtype=np.float32)[new_rows]
+                    self._db.executemany(
+                        "INSERT INTO index_log (resume_id, embedding) VALUES (?, ?)",
+                        [(resume_id, vector.tobytes())
+                         for resume_id, vector in zip(new_ids, vectors)])
+
+                    self._ensure_capacity(len(new_ids))
+                    self._index.add_items(vectors, new_ids, replace_deleted=True)
+                    try:
+                        self._db.commit()
+                    except Exception:
+                        for resume_id in new_ids:
+                            self._index.mark_deleted(resume_id)
+                        raise
+            except Exception:
+                self._db.rollback()
+                raise
+            self._changed(len(new_ids))
+
+        return results
+
+    def find_by_hashes(self, hashes: Iterable[str]) -> Dict[str, int]:
+        """Ids of stored resumes by text hash"""
+        with self._lock:
+            return self._find_by_hashes(hashes)
+
+    def _find_by_hashes(self, hashes):
+        hashes = list(hashes)
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT text_hash, id FROM resumes WHERE text_hash IN ({placeholders})",
+                chunk).fetchall()
+            found.update(rows)
+        return found
+
+    def get_embeddings(self, ids: List[int]) -> np.ndarray:
+        with self._lock:
+            return np.asarray(self._index.get_items(ids), dtype=np.float32)
+
+    def delete(self, resume_id: int) -> bool:
+        with self._lock:
+            try:
+                cursor = self._db.execute(
+                    "DELETE FROM resumes WHERE id = ?", (resume_id,))
+                if cursor.rowcount == 0:
+                    self._db.rollback()
+                    return False
+                self._db.execute(
+                    "INSERT INTO index_log (resume_id, embedding) VALUES (?, NULL)", (resume_id,))
+
+                # The row only goes once the vector is gone, and comes back if the commit fails
+                self._index.mark_deleted(resume_id)
+                try:
+                    self._db.commit()
+                except Exception:
+                    self._index.unmark_deleted(resume_id)
+                    raise
+            except Exception:
+                self._db.rollback()
+                raise
+            self._changed(1)
+        return True
+
+    def search(self, query_embedding: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Approximate top-k resumes as (id, cosine similarity) pairs"""
+        with self._lock:
+            k = min(k, self._count())
+            if k <= 0:
+                return []
+
+            # ef must be at least k for hnswlib to return k results
+            self._index.set_ef(max(CORPUS_HNSW_EF_SEARCH, k))
+            labels, distances = self._index.knn_query(query_embedding, k=k)
+
+        # Cosine distance is 1 - similarity
+        return [(int(label), float(1.0 - distance))
+                for label, distance in zip(labels[0], distances[0])]
+
+    def get_records(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, text_hash, filename, entities FROM resumes WHERE id IN ({placeholders})",
+                list(ids)).fetchall()
+        return {
+            row[0]: {
+                'id': row[0],
+                'text_hash': row[1],
+                'filename': row[2],
+                'entities': json.loads(row[3])
+            }
+            for row in rows
+        }
+
+    def flush(self):
+        """Save the index now if it has unsaved changes"""
+        with self._lock:
+            if self._pending_ops:
+                self._save()
+
+    def _changed(self, count):
+        if not count:
+            return
+        self._pending_ops += count
+        if (self._pending_ops >= CORPUS_INDEX_SAVE_OPS
+                or time.time() - self._last_save >= CORPUS_INDEX_SAVE_INTERVAL):
+            try:
+                self._save()
+            except Exception as e:
+                # The changes stay in the log and are saved with the next batch
+                logger.warning(f"Corpus index save failed: {str(e)}")
+
+    def _save(self):
+        # Write to a temporary file first so a crash never leaves a torn index
+        tmp_path = self._index_path + ".tmp"
+        self._index.save_index(tmp_path)
+        os.replace(tmp_path, self._index_path)
+
+        # Everything logged so far is in the saved file
+        self._db.execute("DELETE FROM index_log")
+        self._db.commit()
+        self._pending_ops = 0
+        self._last_save = time.time()
+
+
+# Global corpus instance (lazy loading)
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> ResumeCorpus:
+    """Lazy open the resume corpus"""
+    global _corpus
+    with _corpus_lock:
+        if _corpus is None:
+            dim = get_semantic_model().get_sentence_embedding_dimension()
+            _corpus = ResumeCorpus(CORPUS_DIR, dim, resume_embedding_signature())
+            atexit.register(_corpus.flush)
+    return _corpus
+
+
+def ingest_resumes(resumes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Parse and embed new resumes once and add them to the corpus.
+
+    Resumes whose extracted text is already stored are skipped before any
+    model runs. Returns one entry per resume with usable text.
+    """
+
+    resumes_data = [r for r in resumes_data
+                    if r.get('text') and len(r['text'].strip()) >= 50]
+    if not resumes_data:
+        return []
+
+    corpus = get_corpus()
+    hashes = [text_hash(r['text']) for r in resumes_data]
+    stored = corpus.find_by_hashes(hashes)
+
+    # Only the first copy of each unseen text needs parsing
+    pending = {}
+    for r, h in zip(resumes_data, hashes):
+        if h not in stored and h not in pending:
+            pending[h] = r
+
+    added = {}
+    if pending:
+        texts = [r['text'] for r in pending.values()]
+        entities_list = extract_entities_batch(texts)
+        embeddings = encode_resume_texts(texts)
+
+        records = [{
+            'text_hash': h,
+            'filename': r.get('filename'),
+            'entities': entities
+        } for (h, r), entities in zip(pending.items(), entities_list)]
+
+        for record, (resume_id, is_new) in zip(records, corpus.add(records, embeddings)):
+            if is_new:
+                added[record['text_hash']] = resume_id
+            else:
+                # Stored concurrently by another request
+                stored[record['text_hash']] = resume_id
+
+    results = []
+    first_seen = set()
+    for r, h in zip(resumes_data, hashes):
+        is_new = h in added and h not in first_seen
+        first_seen.add(h)
+        results.append({
+            'index': r.get('index'),
+            'filename': r.get('filename'),
+            'resume_id': added.get(h, stored.get(h)),
+            'duplicate': not is_new
+        })
+
+    logger.info(
+        f"Ingested {len(added)} new resumes into the corpus, "
+        f"skipped {len(results) - len(added)} duplicates")
+    return results
+
+
+def rank_stored_resumes(
+    resume_ids: List[int],
+    job_description: str,
+    top_k: int = DEFAULT_TOP_K
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank resumes already in the corpus, reusing their stored entities and
+    embeddings. Returns the results and the number of ids found.
+    """
+
+    job_profile = build_job_profile(job_description)
+    corpus = get_corpus()
+
+    records = corpus.get_records(list(dict.fromkeys(resume_ids)))
+    missing = set(resume_ids) - set(records)
+    if missing:
+        logger.warning(f"Unknown corpus resume ids: {sorted(missing)}")
+
+    ids = list(records)
+    if not ids:
+        return [], 0
+
+    # Stored embeddings are unit length: one matrix-vector product scores all
+    semantic_scores = corpus.get_embeddings(ids) @ get_job_embedding(job_profile)
+
+    scored = score_parsed_batch(
+        ids, semantic_scores, [records[resume_id]['entities'] for resume_id in ids], job_profile)
+    survivors, total_scored = select_top_k(scored, top_k)
+
+    return [build_result(s, job_profile) for s in survivors], total_scored
+
+
+def search_corpus(job_description: str, top_k: int = DEFAULT_TOP_K) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Retrieve candidates from the ANN index and re-rank them with the
+    composite score. Returns the results and the number of candidates
+    re-ranked; each result's "index" is its corpus resume id.
+    """
+
+    job_profile = build_job_profile(job_description)
+    corpus = get_corpus()
+
+    candidates = corpus.search(
+        get_job_embedding(job_profile), max(top_k, CORPUS_RERANK_CANDIDATES))
+    records = corpus.get_records([resume_id for resume_id, _ in candidates])
+
+    candidates = [(resume_id, similarity) for resume_id, similarity in candidates
+                  if resume_id in records]
+    scored = score_parsed_batch(
+        [resume_id for resume_id, _ in candidates],
+        [similarity for _, similarity in candidates],
+        [records[resume_id]['entities'] for resume_id, _ in candidates],
+        job_profile)
+    survivors, total_scored = select_top_k(scored, top_k)
+
+    return [build_result(s, job_profile) for s in survivors], total_scored
+
+
+def _ingest_directory(directory):
+    from extractor import extract_texts
+
+    filenames = sorted(f for f in os.listdir(directory)
+                       if f.lower().endswith(('.pdf', '.docx')))
+    documents = []
+    for filename in filenames:
+        with open(os.path.join(directory, filename), 'rb') as f:
+            documents.append((f.read(), filename.lower().rsplit('.', 1)[-1]))
+
+    texts = extract_texts(documents)
+    results = ingest_resumes([{'text': text, 'filename': filename}
+                              for filename, text in zip(filenames, texts) if text])
+    added = sum(1 for r in results if not r['duplicate'])
+    print(f"Ingested {added} new of {len(filenames)} files into {CORPUS_DIR}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'ingest':
+        print("Usage: python corpus.py ingest <directory>")
+        sys.exit(1)
+    _ingest_directory(sys.argv[2])
@@ -1,6 +1,11 @@
 import os
 from sentence_transformers import SentenceTransformer
-from config import SENTENCE_TRANSFORMER_MODEL
+from config import (
+    SENTENCE_TRANSFORMER_MODEL, EMBEDDING_BACKEND, ONNX_MODEL_DIR, EMBEDDING_MAX_SEQ_LENGTH,
+    NER_BACKEND, NER_MODEL
+)
+from embedding_backend import OnnxInt8EmbeddingBackend
+from onnx_export import ONNX_INT8, export_int8_onnx
 
 
 def download_model():
@@ -9,6 +14,17 @@ def download_model():
     model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
     print("Model downloaded successfully")
 
+    if EMBEDDING_BACKEND == ONNX_INT8:
+        print(f"Exporting quantized ONNX model to {ONNX_MODEL_DIR}")
+        # Built directly (no PyTorch fallback) so a failed export fails the build
+        OnnxInt8EmbeddingBackend(SENTENCE_TRANSFORMER_MODEL, ONNX_MODEL_DIR, EMBEDDING_MAX_SEQ_LENGTH)
+
+    if NER_BACKEND == ONNX_INT8:
+        from optimum.onnxruntime import ORTModelForTokenClassification
+
+        print(f"Exporting quantized ONNX NER model {NER_MODEL} to {ONNX_MODEL_DIR}")
+        export_int8_onnx(ORTModelForTokenClassification, NER_MODEL, NER_MODEL, ONNX_MODEL_DIR)
+
 
 if __name__ == "__main__":
     download_model()
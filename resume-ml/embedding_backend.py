@@ -0,0 +1,95 @@
+"""
+Embedding backends for the sentence encoder.
+
+"torch" runs the SentenceTransformer in fp32 PyTorch. "onnx-int8" runs
+an ONNX Runtime export of the same model with dynamic int8 quantization
+(see onnx_export). Both expose encode() and
+get_sentence_embedding_dimension() like SentenceTransformer, so callers
+do not care which one is active.
+"""
+from typing import List
+
+import numpy as np
+
+from onnx_export import TORCH, ONNX_INT8, QUANTIZED_FILE_NAME, export_int8_onnx
+from utils import logger
+
+
+class TorchEmbeddingBackend:
+    """The SentenceTransformer model as-is"""
+
+    name = TORCH
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        return self.model.encode(
+            texts, batch_size=batch_size, normalize_embeddings=normalize_embeddings, **kwargs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxInt8EmbeddingBackend:
+    """
+    Dynamically quantized ONNX Runtime export with the same pooling as the
+    SentenceTransformer pipeline (mean over tokens, optional L2 norm).
+    """
+
+    name = ONNX_INT8
+
+    def __init__(self, model_name: str, model_dir: str, max_seq_length: int):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        quantized_dir = export_int8_onnx(ORTModelForFeatureExtraction, model_name, hub_name, model_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(quantized_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            quantized_dir, file_name=QUANTIZED_FILE_NAME)
+        self.max_seq_length = max_seq_length
+        self._dim = self.model.config.hidden_size
+
+    def encode(self, texts, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(texts, str)
+        texts: List[str] = [texts] if single else list(texts)
+
+        embeddings = np.zeros((len(texts), self._dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            inputs = self.tokenizer(
+                batch, padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np")
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[start:start + len(batch)] = pooled
+
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+
+def load_embedding_backend(backend: str, model_name: str, model_dir: str, max_seq_length: int):
+    """Build the configured backend, falling back to PyTorch if it cannot load"""
+    if backend == ONNX_INT8:
+        try:
+            return OnnxInt8EmbeddingBackend(model_name, model_dir, max_seq_length)
+        except ImportError as e:
+            logger.error(
+                f"ONNX backend needs 'optimum[onnxruntime]' ({str(e)}), using PyTorch")
+        except Exception as e:
+            logger.error(f"ONNX backend failed to load ({str(e)}), using PyTorch")
+    elif backend != TORCH:
+        logger.error(f"Unknown embedding backend '{backend}', using PyTorch")
+
+    return TorchEmbeddingBackend(model_name)
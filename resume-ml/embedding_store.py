@@ -0,0 +1,213 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils import logger
+
+INDEX_FILENAME = "index.json"
+JOURNAL_FILENAME = "index.journal"
+VECTORS_FILENAME = "embeddings.f32"
+LOCK_FILENAME = "lock"
+
+
+def make_embedding_key(text: str, model_name: str) -> str:
+    """Content address for a text embedded by a given model"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode('utf-8'))
+    digest.update(b"\0")
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _acquire_worker_directory(directory: str):
+    """
+    Lock the first free worker-<n> subdirectory for this process's lifetime.
+    Server processes sharing EMBEDDING_CACHE_DIR each get their own slot
+    map and memmap, and a restarted process reuses a released directory.
+    """
+    n = 0
+    while True:
+        worker_dir = os.path.join(directory, f"worker-{n}")
+        os.makedirs(worker_dir, exist_ok=True)
+        lock_file = open(os.path.join(worker_dir, LOCK_FILENAME), 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return worker_dir, lock_file
+        except OSError:
+            lock_file.close()
+            n += 1
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding cache keyed by content hash.
+
+    Vectors live in a memory-mapped float32 array of fixed capacity and
+    index.json maps each key to its row. Changes since the last index
+    write are appended to index.journal, which is folded back into
+    index.json once it grows past the capacity or on flush(). When the
+    store is full the least recently used row is overwritten.
+    """
+
+    def __init__(self, directory: str, model_name: str, dim: int, max_entries: int):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = max_entries
+        self._lock = threading.Lock()
+        self._slots = OrderedDict()  # key -> row, oldest first
+        self._free_slots = []
+        self._journal_lines = 0
+
+        self.directory, self._lock_file = _acquire_worker_directory(directory)
+        self._index_path = os.path.join(self.directory, INDEX_FILENAME)
+        self._journal_path = os.path.join(self.directory, JOURNAL_FILENAME)
+        self._vectors_path = os.path.join(self.directory, VECTORS_FILENAME)
+
+        if not self._load_index():
+            self._reset()
+
+    def _load_index(self) -> bool:
+        if not (os.path.exists(self._index_path) and os.path.exists(self._vectors_path)):
+            return False
+
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Embedding cache index unreadable, resetting: {e}")
+            return False
+
+        # A different model or shape invalidates every stored vector
+        if (index.get("model") != self.model_name or index.get("dim") != self.dim
+                or index.get("capacity") != self.capacity):
+            logger.info("Embedding cache settings changed, resetting")
+            return False
+
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode='r+',
+            shape=(self.capacity, self.dim))
+        self._slots = OrderedDict((key, slot) for key, slot in index["entries"])
+        if self._replay_journal():
+            # Start from a clean journal so nothing is appended after a torn line
+            self._write_index()
+        used = set(self._slots.values())
+        self._free_slots = [s for s in range(self.capacity - 1, -1, -1) if s not in used]
+
+        logger.info(
+            f"Loaded embedding cache with {len(self._slots)} entries from {self.directory}")
+        return True
+
+    def _replay_journal(self) -> bool:
+        if not os.path.exists(self._journal_path) or os.path.getsize(self._journal_path) == 0:
+            return False
+
+        owners = {slot: key for key, slot in self._slots.items()}
+        with open(self._journal_path, 'r') as f:
+            for line in f:
+                try:
+                    key, slot = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash; everything before it is valid
+                    break
+                # [null, row] releases a row before it is overwritten
+                previous = owners.pop(slot, None)
+                if previous is not None:
+                    self._slots.pop(previous, None)
+                if key is not None:
+                    self._slots.pop(key, None)
+                    self._slots[key] = slot
+                    owners[slot] = key
+        return True
+
+    def _reset(self):
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode='w+',
+            shape=(self.capacity, self.dim))
+        self._slots = OrderedDict()
+        self._free_slots = list(range(self.capacity - 1, -1, -1))
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            "model": self.model_name,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "entries": list(self._slots.items())
+        }
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._index_path)
+
+        # The journal is folded into the index
+        with open(self._journal_path, 'w'):
+            pass
+        self._journal_lines = 0
+
+    def _append_journal(self, records: List[List[Optional[object]]]):
+        with open(self._journal_path, 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_lines += len(records)
+
+    def make_key(self, text: str) -> str:
+        return make_embedding_key(text, self.model_name)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the keys that are present"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is None:
+                    continue
+                self._slots.move_to_end(key)
+                found[key] = np.array(self._vectors[slot])
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        """Store vectors, evicting least recently used rows when full"""
+        if not vectors:
+            return
+        if len(vectors) > self.capacity:
+            # Only the last `capacity` vectors of an oversized batch fit
+            vectors = dict(list(vectors.items())[-self.capacity:])
+
+        with self._lock:
+            assignments = []
+            for key in vectors:
+                slot = self._slots.pop(key, None)
+                if slot is None:
+                    if self._free_slots:
+                        slot = self._free_slots.pop()
+                    else:
+                        _, slot = self._slots.popitem(last=False)
+                assignments.append((key, slot))
+
+            # Release rows before overwriting them so a crash in between never
+            # leaves an index entry pointing at another text's vector
+            self._append_journal([[None, slot] for _, slot in assignments])
+            for key, slot in assignments:
+                self._slots[key] = slot
+                self._vectors[slot] = vectors[key]
+            self._vectors.flush()
+
+            if self._journal_lines + len(assignments) > self.capacity:
+                self._write_index()
+            else:
+                self._append_journal([[key, slot] for key, slot in assignments])
+
+    def flush(self):
+        """Persist the current recency order"""
+        with self._lock:
+            self._write_index()
+
+    def __len__(self):
+        return len(self._slots)
@@ -1,9 +1,332 @@
+import hashlib
+import multiprocessing
+import os
+import signal
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 import pdfplumber
 import docx
 from io import BytesIO
+from config import TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_DIR, EXTRACTION_WORKERS, EXTRACTION_TIMEOUT
+from utils import logger
 
 
-def extract_text(file_bytes, file_type):
+class TextCache:
+    """Two-tier cache of extracted text: in-memory LRU plus optional directory"""
+
+    def __init__(self, max_entries, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+
+        if self.directory:
+            try:
+                with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                    text = f.read()
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, text)
+                return text
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Text cache read failed for {key}: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, text):
+        self._remember(key, text)
+
+        if self.directory:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Text cache write failed for {key}: {e}")
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+
+_text_cache = TextCache(TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_DIR or None)
+
+# Worker pool for CPU-bound parsing (lazy loading)
+_process_pool = None
+_process_pool_unavailable = False
+_process_pool_lock = threading.Lock()
+
+# Extra time the caller allows a worker that should have enforced the timeout itself
+EXTRACTION_TIMEOUT_GRACE = 5
+
+
+class ExtractionTimeout(Exception):
+    """Raised inside the extracting process when a file exceeds its time limit"""
+
+
+def file_digest(file_bytes, file_type):
+    digest = hashlib.sha256()
+    digest.update(file_type.encode('utf-8'))
+    digest.update(b"\0")
+    digest.update(file_bytes)
+    return digest.hexdigest()
+
+
+def get_text_cache_stats():
+    return _text_cache.stats()
+
+
+def extract_text(file_bytes, file_type, use_cache=True):
+    if not use_cache:
+        return _extract_uncached(file_bytes, file_type)
+
+    key = file_digest(file_bytes, file_type)
+    text = _text_cache.get(key)
+    if text is None:
+        text = _extract_uncached(file_bytes, file_type)
+        _text_cache.put(key, text)
+    return text
+
+
+def get_process_pool():
+    """Lazy create the extraction pool (None when disabled or unsupported)"""
+    global _process_pool, _process_pool_unavailable
+    if _process_pool is None and not _process_pool_unavailable and EXTRACTION_WORKERS > 1:
+        with _process_pool_lock:
+            if _process_pool is None and not _process_pool_unavailable:
+                try:
+                    # Spawned workers never inherit torch threads or model memory
+                    # (app.py skips its model warmup when re-imported as __mp_main__)
+                    _process_pool = ProcessPoolExecutor(
+                        max_workers=EXTRACTION_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"))
+                    logger.info(
+                        f"Started extraction pool with {EXTRACTION_WORKERS} workers")
+                except (OSError, NotImplementedError) as e:
+                    # e.g. AWS Lambda has no /dev/shm for multiprocessing semaphores
+                    logger.warning(
+                        f"Process pool unavailable, extracting sequentially: {str(e)}")
+                    _process_pool_unavailable = True
+    return _process_pool
+
+
+def _recycle_process_pool(pool):
+    """Kill a pool with a stuck worker; the next get_process_pool() starts a fresh one"""
+    global _process_pool
+    if pool is None:
+        return
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+
+    logger.warning("Restarting extraction pool after a stuck worker")
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_with_deadline(file_bytes, file_type, timeout):
+    """
+    Extract with the time limit enforced in this process, measured from
+    when the file starts. Needs the main thread (always true in pool
+    workers); elsewhere the file runs without a limit.
+    """
+    if not timeout or threading.current_thread() is not threading.main_thread():
+        return _extract_uncached(file_bytes, file_type)
+
+    def on_alarm(signum, frame):
+        raise ExtractionTimeout(f"timed out after {timeout}s")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _extract_uncached(file_bytes, file_type)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _submit(file_bytes, file_type, timeout):
+    """(pool, future) for one file; runs it in this thread if no pool can be started"""
+    pool = get_process_pool()
+    if pool is None:
+        future = Future()
+        try:
+            future.set_result(_extract_with_deadline(file_bytes, file_type, timeout))
+        except Exception as e:
+            future.set_exception(e)
+        return None, future
+
+    # memoryviews cannot be pickled, so workers get a bytes copy
+    return pool, pool.submit(_extract_with_deadline, bytes(file_bytes), file_type, timeout)
+
+
+def _await_extraction(i, submission, file_bytes, file_type, timeout):
+    """
+    Result of a pooled extraction, or None on failure. Workers stop files
+    that run past `timeout` themselves; a worker that does not (stuck in
+    native code) gets the pool recycled. Files lost to a recycled pool are
+    retried once on the new one.
+    """
+    pool, future = submission
+    for attempt in range(2):
+        try:
+            # The oldest pending file starts within one timeout and runs for at most another
+            return future.result(timeout=2 * timeout + EXTRACTION_TIMEOUT_GRACE)
+        except ExtractionTimeout:
+            logger.error(f"Extraction of document {i} timed out after {timeout}s")
+            return None
+        except FutureTimeoutError:
+            logger.error(f"Extraction of document {i} stuck past {timeout}s, killing workers")
+            _recycle_process_pool(pool)
+            return None
+        except (BrokenProcessPool, CancelledError):
+            if attempt:
+                logger.error(f"Extraction of document {i} lost with its worker")
+                return None
+            pool, future = _submit(file_bytes, file_type, timeout)
+        except Exception as e:
+            logger.error(f"Error extracting document {i}: {str(e)}")
+            return None
+    return None
+
+
+def extract_texts(documents, timeout=EXTRACTION_TIMEOUT):
+    """
+    Extract text from a list of (file_bytes, file_type) pairs, where
+    file_bytes may be bytes or a memoryview.
+
+    Cache misses are parsed in parallel on the process pool. Results keep
+    the input order; documents that fail or run longer than `timeout`
+    seconds come back as None.
+    """
+    results = [None] * len(documents)
+    pending = []
+
+    for i, (file_bytes, file_type) in enumerate(documents):
+        key = file_digest(file_bytes, file_type)
+        text = _text_cache.get(key)
+        if text is not None:
+            results[i] = text
+        else:
+            pending.append((i, key))
+
+    pool = get_process_pool() if len(pending) > 1 else None
+
+    if pool is None:
+        for i, key in pending:
+            try:
+                results[i] = _extract_with_deadline(*documents[i], timeout)
+                _text_cache.put(key, results[i])
+            except ExtractionTimeout:
+                logger.error(f"Extraction of document {i} timed out after {timeout}s")
+            except Exception as e:
+                logger.error(f"Error extracting document {i}: {str(e)}")
+        return results
+
+    submissions = [(i, key, _submit(*documents[i], timeout)) for i, key in pending]
+
+    for i, key, submission in submissions:
+        results[i] = _await_extraction(i, submission, *documents[i], timeout)
+        if results[i] is not None:
+            _text_cache.put(key, results[i])
+
+    return results
+
+
+def iter_extract_texts(documents, max_pending=None, timeout=EXTRACTION_TIMEOUT):
+    """
+    Extract text from an iterable of (file_bytes, file_type) pairs as they
+    arrive, yielding one text (or None on failure) per document in input
+    order. Up to `max_pending` documents are parsed on the process pool
+    while the source keeps producing, so a slow producer such as a network
+    download overlaps with parsing.
+    """
+    if get_process_pool() is None:
+        for i, (file_bytes, file_type) in enumerate(documents):
+            try:
+                key = file_digest(file_bytes, file_type)
+                text = _text_cache.get(key)
+                if text is None:
+                    text = _extract_with_deadline(file_bytes, file_type, timeout)
+                    _text_cache.put(key, text)
+                yield text
+            except ExtractionTimeout:
+                logger.error(f"Extraction of document {i} timed out after {timeout}s")
+                yield None
+            except Exception as e:
+                logger.error(f"Error extracting document {i}: {str(e)}")
+                yield None
+        return
+
+    max_pending = max_pending or 2 * EXTRACTION_WORKERS
+    pending = deque()
+
+    def drain_one():
+        i, key, text, submission, document = pending.popleft()
+        if submission is None:
+            return text
+        text = _await_extraction(i, submission, *document, timeout)
+        if text is not None:
+            _text_cache.put(key, text)
+        return text
+
+    for i, (file_bytes, file_type) in enumerate(documents):
+        key = file_digest(file_bytes, file_type)
+        text = _text_cache.get(key)
+        if text is not None:
+            pending.append((i, key, text, None, None))
+        else:
+            pending.append((i, key, None, _submit(file_bytes, file_type, timeout),
+                            (file_bytes, file_type)))
+
+        # Hand over finished documents right away, block only when the window is full
+        while pending and (len(pending) > max_pending or
+                           pending[0][3] is None or pending[0][3][1].done()):
+            yield drain_one()
+
+    while pending:
+        yield drain_one()
+
+
+def _extract_uncached(file_bytes, file_type):
     if file_type == "pdf":
         return extract_pdf(file_bytes)
     elif file_type == "docx":
@@ -0,0 +1,88 @@
+"""
+Dynamic micro-batching for a shared model.
+
+Concurrent requests call InferenceScheduler.encode(); a single worker
+thread gathers their texts into one batch (up to max_batch_size texts,
+waiting at most max_wait_ms after the first arrives), runs one encode
+call, and hands each caller its slice of the result through a future.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+from utils import logger
+
+
+class InferenceScheduler:
+    """Coalesces encode calls from many threads into shared forward passes"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], max_batch_size: int, max_wait_ms: float):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking encode; the texts may share a batch with other callers"""
+        if not texts:
+            return self.encode_fn([])
+
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="inference-scheduler", daemon=True)
+                self._worker.start()
+
+    def _next_batch(self):
+        # Block for the first request, then gather until full or the deadline passes
+        requests = [self._queue.get()]
+        size = len(requests[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            size += len(request[0])
+
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._next_batch()
+            texts = [text for request_texts, _ in requests for text in request_texts]
+
+            try:
+                embeddings = self.encode_fn(texts)
+            except Exception as e:
+                logger.error(f"Batched inference failed: {str(e)}")
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+
+            if len(requests) > 1:
+                logger.info(
+                    f"Micro-batched {len(texts)} texts from {len(requests)} requests")
+
+            start = 0
+            for request_texts, future in requests:
+                end = start + len(request_texts)
+                future.set_result(embeddings[start:end])
+                start = end
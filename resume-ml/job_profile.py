@@ -0,0 +1,77 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Set
+
+import numpy as np
+
+from config import JOB_PROFILE_CACHE_SIZE
+from parser import extract_skills_from_job_description
+
+# Required experience phrasing, tried in order
+REQUIRED_YEARS_PATTERNS = [
+    re.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'),
+    re.compile(r'(\d+)\+?\s*yrs?\s+experience'),
+    re.compile(r'minimum\s+(\d+)\s+years?'),
+]
+
+
+@dataclass
+class JobProfile:
+    """Everything scoring needs from a job description, computed once"""
+
+    description: str
+    normalized_text: str
+    required_skills: Set[str]
+    required_skills_titled: Set[str]
+    required_years: Optional[float]
+    embedding: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+def extract_required_years(jd_lower: str) -> Optional[float]:
+
+    for pattern in REQUIRED_YEARS_PATTERNS:
+        match = pattern.search(jd_lower)
+        if match:
+            try:
+                return float(match.group(1))
+            except ValueError:
+                pass
+
+    return None
+
+
+_profile_cache = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+
+def build_job_profile(job_description: str) -> JobProfile:
+    """Return the profile for a job description, reusing it across requests"""
+
+    key = hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+
+    with _profile_cache_lock:
+        profile = _profile_cache.get(key)
+        if profile is not None:
+            _profile_cache.move_to_end(key)
+            return profile
+
+    jd_lower = job_description.lower()
+    required_skills = extract_skills_from_job_description(job_description)
+
+    profile = JobProfile(
+        description=job_description,
+        normalized_text=jd_lower,
+        required_skills=required_skills,
+        required_skills_titled={s.title() for s in required_skills},
+        required_years=extract_required_years(jd_lower)
+    )
+
+    with _profile_cache_lock:
+        _profile_cache[key] = profile
+        while len(_profile_cache) > JOB_PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+
+    return profile
@@ -0,0 +1,248 @@
+"""
+Background ranking jobs for pools too large for one HTTP request.
+
+A job is submitted with either uploaded files (spooled to JOBS_DIR so
+they are never all held in memory) or an S3 bucket/prefix. Worker
+threads process jobs from a local queue, reporting how many resumes
+have been processed, and write the ranked result to the job directory
+for later retrieval.
+"""
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import (
+    JOBS_DIR, JOB_WORKERS, JOB_RETENTION_SECONDS, S3_MANIFEST_ENABLED,
+    DEFAULT_TOP_K, PREFILTER_SHORTLIST_SIZE
+)
+from ranker import rank_resumes, rank_resumes_stream
+from resume_sources import (
+    ResumeDocument, detect_file_type, make_s3_client, list_s3_resume_objects,
+    iter_s3_documents, iter_extracted_resumes
+)
+from s3_manifest import load_s3_resumes
+from utils import format_success_response, logger
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of one ranking job, as reported by GET /jobs/<id>"""
+
+    id: str
+    job_description: str = field(repr=False)
+    top_k: int = DEFAULT_TOP_K
+    shortlist_size: Optional[int] = PREFILTER_SHORTLIST_SIZE
+    source: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    total: Optional[int] = None
+    processed: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(JOBS_DIR, self.id)
+
+    @property
+    def result_path(self) -> str:
+        return os.path.join(self.directory, "result.json")
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = asdict(self)
+        del status['job_description']
+        status['source'] = {k: v for k, v in self.source.items() if k != 'files'}
+        return status
+
+
+class JobQueue:
+    """In-process job registry with a pool of background worker threads"""
+
+    def __init__(self, num_workers: int):
+        self.num_workers = max(1, num_workers)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._s3_client = None
+
+    def submit_files(self, job_description: str, top_k: int, shortlist_size: Optional[int], files) -> Job:
+        """Spool Werkzeug-style uploads (anything with .filename and .save) to disk"""
+        job = Job(id=uuid.uuid4().hex, job_description=job_description,
+                  top_k=top_k, shortlist_size=shortlist_size)
+        os.makedirs(job.directory, exist_ok=True)
+
+        spooled = []
+        for i, file in enumerate(files):
+            if not file or not file.filename:
+                logger.warning(f"Job {job.id}: resume {i} is empty")
+                continue
+
+            file_type = detect_file_type(file.filename)
+            if file_type is None:
+                logger.warning(
+                    f"Job {job.id}: resume {i} has unsupported type - {file.filename}")
+                continue
+
+            path = os.path.join(job.directory, f"{i}.{file_type}")
+            file.save(path)
+            spooled.append({'index': i, 'path': path,
+                            'file_type': file_type, 'filename': file.filename.lower()})
+
+        job.source = {'type': 'upload', 'files': spooled}
+        job.total = len(spooled)
+        return self._enqueue(job)
+
+    def submit_s3(self, job_description: str, top_k: int, shortlist_size: Optional[int],
+                  bucket: str, prefix: str) -> Job:
+        job = Job(id=uuid.uuid4().hex, job_description=job_description,
+                  top_k=top_k, shortlist_size=shortlist_size,
+                  source={'type': 's3', 'bucket': bucket, 'prefix': prefix})
+        os.makedirs(job.directory, exist_ok=True)
+        return self._enqueue(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def load_result(self, job: Job) -> Dict[str, Any]:
+        with open(job.result_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _enqueue(self, job: Job) -> Job:
+        self._prune()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._start_workers()
+        self._queue.put(job.id)
+        logger.info(f"Queued ranking job {job.id} ({job.source['type']})")
+        return job
+
+    def _start_workers(self):
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.num_workers:
+            worker = threading.Thread(
+                target=self._run, name=f"job-worker-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _prune(self):
+        """Forget finished jobs past their retention period"""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _run(self):
+        while True:
+            job = self.get(self._queue.get())
+            if job is None:
+                continue
+
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                self._process(job)
+                job.status = COMPLETED
+            except Exception as e:
+                logger.error(f"Ranking job {job.id} failed: {str(e)}", exc_info=True)
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                logger.info(
+                    f"Ranking job {job.id} {job.status} in {job.finished_at - job.started_at:.2f}s")
+
+    def _process(self, job: Job):
+        # Progress counts files as they are fetched and extracted, failures included
+        def progress():
+            job.processed += 1
+
+        if job.source['type'] == 's3':
+            resumes = self._s3_resumes(job, progress)
+        else:
+            resumes = iter_extracted_resumes(
+                _spooled_documents(job.source['files'], progress), progress)
+
+        if job.shortlist_size:
+            # The prefilter needs every text at once
+            resumes_data = list(resumes)
+            ranked_results = rank_resumes(
+                resumes_data, job.job_description, job.top_k, shortlist_size=job.shortlist_size)
+            total_scored = len(resumes_data)
+        else:
+            ranked_results, total_scored = rank_resumes_stream(
+                resumes, job.job_description, job.top_k)
+
+        response = format_success_response(ranked_results, total_scored)
+        response['processing_time_seconds'] = round(time.time() - job.started_at, 2)
+
+        tmp_path = job.result_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(response, f)
+        os.replace(tmp_path, job.result_path)
+
+        # Spooled uploads are no longer needed once the result is stored
+        for spooled in job.source.get('files', []):
+            try:
+                os.remove(spooled['path'])
+            except OSError:
+                pass
+
+    def _s3_resumes(self, job: Job, progress: Callable[[], None]) -> Iterable[Dict[str, Any]]:
+        if self._s3_client is None:
+            self._s3_client = make_s3_client()
+
+        bucket, prefix = job.source['bucket'], job.source['prefix']
+        objects = list_s3_resume_objects(self._s3_client, bucket, prefix)
+        job.total = len(objects)
+
+        if S3_MANIFEST_ENABLED:
+            return load_s3_resumes(self._s3_client, bucket, prefix, objects, progress=progress)
+        return iter_extracted_resumes(
+            iter_s3_documents(self._s3_client, bucket, [key for key, _ in objects],
+                              on_error=lambda key: progress()),
+            progress)
+
+
+def _spooled_documents(files: List[Dict[str, Any]], on_error: Callable[[], None]) -> Iterator[ResumeDocument]:
+    """Read spooled uploads back one at a time"""
+    for spooled in files:
+        try:
+            with open(spooled['path'], 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Error reading spooled resume {spooled['path']}: {str(e)}")
+            on_error()
+            continue
+        yield ResumeDocument(spooled['index'], data, spooled['file_type'], spooled['filename'])
+
+
+# Global job queue (lazy loading)
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Lazy create the background job queue"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(JOB_WORKERS)
+    return _job_queue
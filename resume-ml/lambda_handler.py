@@ -4,15 +4,17 @@ AWS Lambda Handler for Resume Ranking API
 import json
 import base64
 import os
-import boto3
-from io import BytesIO
 from requests_toolbelt.multipart.decoder import MultipartDecoder
-from extractor import extract_text
-from ranker import rank_resumes
-from parser import extract_skills_from_job_description
+from ranker import rank_resumes, rank_resumes_stream
+from resume_sources import (
+    make_s3_client, multipart_part_document, base64_documents, list_s3_resume_objects,
+    iter_s3_documents, extract_resumes, iter_extracted_resumes
+)
+from s3_manifest import load_s3_resumes
 from utils import logger
+from config import PREFILTER_SHORTLIST_SIZE, S3_MANIFEST_ENABLED
 
-s3_client = boto3.client('s3')
+s3_client = make_s3_client()
 
 
 def lambda_handler(event, context):
@@ -26,7 +28,8 @@ def lambda_handler(event, context):
         content_type = next((v for k, v in headers.items()
                             if k.lower() == 'content-type'), '')
 
-        body = {'resumes': []}
+        body = {}
+        documents = []
 
         if 'multipart/form-data' in content_type:
             body_content = event.get('body')
@@ -47,34 +50,22 @@ def lambda_handler(event, context):
                     try:
                         body['top_k'] = int(part.text)
                     except ValueError:
-                        pass
+                        # Kept as text so the checks below reject it with a 400
+                        body['top_k'] = part.text
+                elif 'name="shortlist_size"' in content_disposition:
+                    try:
+                        body['shortlist_size'] = int(part.text)
+                    except ValueError:
+                        # Kept as text so the checks below reject it with a 400
+                        body['shortlist_size'] = part.text
                 elif 'name="s3_bucket"' in content_disposition:
                     body['s3_bucket'] = part.text
                 elif 'name="s3_prefix"' in content_disposition:
                     body['s3_prefix'] = part.text
                 elif 'name="resumes"' in content_disposition:
-                    # Extract filename from Content-Disposition header
-                    filename = "unknown.pdf"
-                    if 'filename="' in content_disposition:
-                        filename = content_disposition.split('filename="')[
-                            1].split('"')[0]
-                    elif "filename='" in content_disposition:
-                        filename = content_disposition.split("filename='")[
-                            1].split("'")[0]
-
-                    file_content = part.content
-                    file_base64 = base64.b64encode(
-                        file_content).decode('utf-8')
-
-                    file_type = 'pdf'
-                    if filename.lower().endswith('.docx'):
-                        file_type = 'docx'
-
-                    body['resumes'].append({
-                        'file_base64': file_base64,
-                        'file_type': file_type,
-                        'filename': filename
-                    })
+                    # Raw part bytes go straight to the extractor
+                    documents.append(multipart_part_document(
+                        len(documents), part, content_disposition))
         else:
             # Parse JSON request body
             # Handle both API Gateway format (with 'body' field) and direct invocation
@@ -87,9 +78,8 @@ def lambda_handler(event, context):
                 # Direct Lambda invocation - event is the body itself
                 body = event
 
-            # Ensure resumes list exists
-            if 'resumes' not in body:
-                body['resumes'] = []
+            # JSON is the only input that carries base64 file content
+            documents = base64_documents(body.get('resumes') or [])
 
         # Validate required fields
         if 'job_description' not in body:
@@ -102,40 +92,43 @@ def lambda_handler(event, context):
                 })
             }
 
+        top_k = body.get('top_k', 10)
+        shortlist_size = body.get('shortlist_size', PREFILTER_SHORTLIST_SIZE)
+
+        # Checked before any S3 listing; bool is an int subclass but not a count
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'success': False,
+                    'error': "'top_k' must be a positive integer"
+                })
+            }
+
+        if shortlist_size is not None and (
+                isinstance(shortlist_size, bool) or not isinstance(shortlist_size, int)
+                or shortlist_size < 1):
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'success': False,
+                    'error': "'shortlist_size' must be a positive integer"
+                })
+            }
+
         # S3 Logic
         s3_bucket = body.get('s3_bucket') or os.environ.get('RESUME_BUCKET')
         s3_prefix = body.get('s3_prefix', '')
 
-        if s3_bucket and not body.get('resumes'):
+        s3_objects = []
+
+        if s3_bucket and not documents and not body.get('resumes'):
             logger.info(
-                f"Fetching resumes from S3 bucket: {s3_bucket}, prefix: {s3_prefix}")
+                f"Listing resumes in S3 bucket: {s3_bucket}, prefix: {s3_prefix}")
             try:
-                paginator = s3_client.get_paginator('list_objects_v2')
-                pages = paginator.paginate(Bucket=s3_bucket, Prefix=s3_prefix)
-
-                for page in pages:
-                    if 'Contents' in page:
-                        for obj in page['Contents']:
-                            key = obj['Key']
-                            if key.endswith('/') or not (key.lower().endswith('.pdf') or key.lower().endswith('.docx')):
-                                continue
-
-                            logger.info(f"Downloading {key} from S3")
-                            response = s3_client.get_object(
-                                Bucket=s3_bucket, Key=key)
-                            file_content = response['Body'].read()
-                            file_base64 = base64.b64encode(
-                                file_content).decode('utf-8')
-
-                            file_type = 'pdf'
-                            if key.lower().endswith('.docx'):
-                                file_type = 'docx'
-
-                            body['resumes'].append({
-                                'file_base64': file_base64,
-                                'file_type': file_type,
-                                'filename': key
-                            })
+                s3_objects = list_s3_resume_objects(s3_client, s3_bucket, s3_prefix)
             except Exception as e:
                 logger.error(f"Error fetching from S3: {str(e)}")
                 return {
@@ -147,7 +140,7 @@ def lambda_handler(event, context):
                     })
                 }
 
-        if not body.get('resumes'):
+        if not documents and not body.get('resumes') and not s3_objects:
             return {
                 'statusCode': 400,
                 'headers': {'Content-Type': 'application/json'},
@@ -158,8 +151,6 @@ def lambda_handler(event, context):
             }
 
         job_description = body['job_description']
-        resumes = body['resumes']
-        top_k = body.get('top_k', 10)
 
         # Validate job description length
         if len(job_description.strip()) < 50:
@@ -172,52 +163,78 @@ def lambda_handler(event, context):
                 })
             }
 
-        logger.info(f"Processing {len(resumes)} resumes for Lambda request")
-
-        # Process resumes
-        resumes_data = []
-        for i, resume in enumerate(resumes):
-            try:
-                file_base64 = resume['file_base64']
-                file_type = resume.get('file_type', 'pdf')
-
-                # Decode base64
-                file_bytes = base64.b64decode(file_base64)
-
-                # Extract text
-                text = extract_text(file_bytes, file_type)
-
-                if not text or len(text.strip()) < 50:
-                    logger.warning(f"Resume {i} has insufficient text content")
-                    continue
+        if s3_objects and S3_MANIFEST_ENABLED:
+            # Only new or modified objects are downloaded and parsed; the
+            # rest come from the ETag manifest, so re-ranking costs scoring
+            logger.info(
+                f"Ranking {len(s3_objects)} resumes from S3 for Lambda request")
+            s3_resumes = load_s3_resumes(
+                s3_client, s3_bucket, s3_prefix, s3_objects)
+            ranked_results = rank_resumes(
+                s3_resumes, job_description, top_k, shortlist_size=shortlist_size)
+            total_processed = len(s3_resumes)
+
+            if total_processed == 0:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'success': False,
+                        'error': 'No valid resumes could be processed'
+                    })
+                }
+        elif s3_objects:
+            # Bulk S3 prefix: downloads, extraction and scoring overlap, and
+            # only a bounded window of files is held in memory at once
+            logger.info(
+                f"Streaming {len(s3_objects)} resumes from S3 for Lambda request")
+            s3_documents = iter_s3_documents(
+                s3_client, s3_bucket, [key for key, _ in s3_objects])
+            if shortlist_size:
+                # The prefilter needs every text at once, but no entities or embeddings
+                s3_resumes = list(iter_extracted_resumes(s3_documents))
+                ranked_results = rank_resumes(
+                    s3_resumes, job_description, top_k, shortlist_size=shortlist_size)
+                total_processed = len(s3_resumes)
+            else:
+                ranked_results, total_processed = rank_resumes_stream(
+                    iter_extracted_resumes(s3_documents), job_description, top_k)
 
-                resumes_data.append({
-                    'index': i,
-                    'text': text,
-                    'file_type': file_type
-                })
+            if total_processed == 0:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'success': False,
+                        'error': 'No valid resumes could be processed'
+                    })
+                }
+        else:
+            logger.info(
+                f"Processing {len(documents)} resumes for Lambda request")
 
-            except Exception as e:
-                logger.error(f"Error processing resume {i}: {str(e)}")
-                continue
+            # Extract text (parallel where the runtime supports a process pool)
+            resumes_data = extract_resumes(documents)
 
-        if not resumes_data:
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json'},
-                'body': json.dumps({
-                    'success': False,
-                    'error': 'No valid resumes could be processed'
-                })
-            }
+            if not resumes_data:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'success': False,
+                        'error': 'No valid resumes could be processed'
+                    })
+                }
 
-        # Rank resumes
-        ranked_results = rank_resumes(resumes_data, job_description, top_k)
+            # Rank resumes
+            ranked_results = rank_resumes(
+                resumes_data, job_description, top_k, shortlist_size=shortlist_size)
+            total_processed = len(resumes_data)
 
         # Return response
         response = {
             'success': True,
-            'total_resumes_processed': len(resumes_data),
+            'total_resumes_processed': total_processed,
             'top_candidates': len(ranked_results),
             'ranked_resumes': ranked_results
         }
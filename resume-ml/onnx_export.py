@@ -0,0 +1,41 @@
+"""
+One-time ONNX export with dynamic int8 quantization.
+
+Hugging Face models are exported with optimum into
+ONNX_MODEL_DIR/<model>/fp32, quantized into ONNX_MODEL_DIR/<model>/int8
+alongside their tokenizer, and reused from there on later loads. Needs
+optimum[onnxruntime].
+"""
+import os
+
+from utils import logger
+
+# Backend names shared by the embedding and NER settings
+TORCH = "torch"
+ONNX_INT8 = "onnx-int8"
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def export_int8_onnx(ort_model_class, model_name: str, hub_name: str, model_dir: str) -> str:
+    """Directory holding the quantized model and tokenizer, exporting it if missing"""
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    base_dir = os.path.join(model_dir, model_name.replace("/", "__"))
+    quantized_dir = os.path.join(base_dir, "int8")
+
+    if not os.path.exists(os.path.join(quantized_dir, QUANTIZED_FILE_NAME)):
+        logger.info(f"Exporting {hub_name} to ONNX with int8 quantization")
+        export_dir = os.path.join(base_dir, "fp32")
+        model = ort_model_class.from_pretrained(hub_name, export=True)
+        model.save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(hub_name).save_pretrained(quantized_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        quantizer.quantize(
+            save_dir=quantized_dir,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+
+    return quantized_dir
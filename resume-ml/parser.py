@@ -1,24 +1,153 @@
 import re
+import threading
 from transformers import pipeline
-from config import SKILL_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS, NER_MODEL
+from config import (
+    SKILL_KEYWORDS, EXPERIENCE_KEYWORDS, EDUCATION_KEYWORDS, NER_MODEL, NER_BATCH_SIZE,
+    NER_BACKEND, ONNX_MODEL_DIR, NAME_EXTRACTION_MODE, NAME_HEURISTIC_MIN_CONFIDENCE,
+    SKILL_TAXONOMY_PATH
+)
+from onnx_export import TORCH, ONNX_INT8, QUANTIZED_FILE_NAME, export_int8_onnx
+from skill_taxonomy import load_skill_taxonomy
 from utils import clean_text, extract_years_of_experience, logger
 
 # Initialize NER pipeline (lazy loading)
 _ner_pipeline = None
+_ner_pipeline_lock = threading.Lock()
+
+# Loaded once and shared by resume and job description parsing
+_skill_taxonomy = load_skill_taxonomy(SKILL_TAXONOMY_PATH, SKILL_KEYWORDS)
 
 
 def get_ner_pipeline():
     """Lazy load NER pipeline"""
     global _ner_pipeline
     if _ner_pipeline is None:
-        logger.info(f"Loading NER model: {NER_MODEL}")
-        _ner_pipeline = pipeline(
-            "ner", model=NER_MODEL, aggregation_strategy="simple")
+        with _ner_pipeline_lock:
+            if _ner_pipeline is None:
+                _ner_pipeline = load_ner_pipeline(NER_BACKEND, NER_MODEL)
     return _ner_pipeline
 
 
+def load_ner_pipeline(backend, model_name):
+    """
+    Build an NER pipeline for the given backend. Every backend returns the
+    same aggregated entity dicts, falling back to PyTorch if it cannot load.
+    """
+    logger.info(f"Loading NER model: {model_name} ({backend})")
+
+    if backend == ONNX_INT8:
+        try:
+            from optimum.onnxruntime import ORTModelForTokenClassification
+            from optimum.pipelines import pipeline as ort_pipeline
+            from transformers import AutoTokenizer
+
+            quantized_dir = export_int8_onnx(
+                ORTModelForTokenClassification, model_name, model_name, ONNX_MODEL_DIR)
+            model = ORTModelForTokenClassification.from_pretrained(
+                quantized_dir, file_name=QUANTIZED_FILE_NAME)
+
+            return ort_pipeline(
+                "ner", model=model, tokenizer=AutoTokenizer.from_pretrained(quantized_dir),
+                accelerator="ort", aggregation_strategy="simple")
+        except ImportError as e:
+            logger.error(
+                f"ONNX NER backend needs 'optimum[onnxruntime]' ({str(e)}), using PyTorch")
+        except Exception as e:
+            logger.error(f"ONNX NER backend failed to load ({str(e)}), using PyTorch")
+    elif backend != TORCH:
+        logger.error(f"Unknown NER backend '{backend}', using PyTorch")
+
+    return pipeline("ner", model=model_name, aggregation_strategy="simple")
+
+
+def get_skill_taxonomy():
+    return _skill_taxonomy
+
+
+def normalize_skill(skill):
+    """Map a skill or alias to its canonical lowercase name"""
+    return _skill_taxonomy.normalize(skill) or skill.lower()
+
+
+IGNORED_HEADERS = {
+    "PROFESSIONAL SUMMARY", "SUMMARY", "OBJECTIVE", "EXPERIENCE",
+    "WORK EXPERIENCE", "EDUCATION", "SKILLS", "CONTACT", "PROJECTS",
+    "CERTIFICATIONS", "LANGUAGES", "REFERENCES", "RESUME", "CV",
+    "CURRICULUM VITAE", "ABOUT ME", "PROFILE", "PERSONAL PROFILE",
+    "CAREER SUMMARY", "TECHNICAL SKILLS", "KEY SKILLS"
+}
+
+# Characters of the resume header passed to NER (name is usually at top)
+NER_HEADER_CHARS = 1000
+
+# Words that mark a line as a section header ("Contact Information",
+# "Professional Experience") rather than a name
+SECTION_HEADER_WORDS = {
+    "contact", "information", "details", "personal", "professional", "experience",
+    "employment", "history", "work", "summary", "technical", "skills", "education",
+    "objective", "profile", "projects", "certifications", "references", "languages",
+    "achievements", "awards", "interests", "qualifications", "publications",
+    "volunteer", "career", "resume", "curriculum", "vitae", "about"
+}
+
+# Title-cased header lines that are usually a job title rather than a name
+JOB_TITLE_WORDS = {
+    "engineer", "developer", "manager", "senior", "junior", "software",
+    "analyst", "designer", "consultant", "intern", "lead", "scientist",
+    "architect", "administrator", "specialist", "director", "officer"
+}
+
+
 def extract_entities(text):
 
+    return extract_entities_batch([text])[0]
+
+
+def extract_entities_batch(texts, batch_size=NER_BATCH_SIZE):
+    """Parse many resumes, running NER over all headers in batched passes"""
+
+    parsed_list = [_extract_basic_entities(text) for text in texts]
+
+    # Empty resumes keep the default (nameless) record
+    indices = [i for i, text in enumerate(texts) if text]
+    if not indices:
+        return parsed_list
+
+    # Tiered mode: only resumes where the cheap heuristics are unsure reach NER
+    ner_indices = indices
+    if NAME_EXTRACTION_MODE == "tiered":
+        ner_indices = []
+        for i in indices:
+            name, confidence = _heuristic_name(texts[i], parsed_list[i]["email"])
+            if confidence >= NAME_HEURISTIC_MIN_CONFIDENCE:
+                parsed_list[i]["name"] = name
+            else:
+                ner_indices.append(i)
+
+        logger.info(
+            f"Name heuristics resolved {len(indices) - len(ner_indices)}/{len(indices)} resumes")
+
+    if not ner_indices:
+        return parsed_list
+
+    try:
+        ner = get_ner_pipeline()
+        ner_results = ner([texts[i][:NER_HEADER_CHARS] for i in ner_indices],
+                          batch_size=batch_size)
+
+        for i, entities in zip(ner_indices, ner_results):
+            parsed_list[i]["name"] = _name_from_ner_results(entities)
+    except Exception as e:
+        logger.warning(f"NER extraction failed: {str(e)}")
+
+    for i in ner_indices:
+        _apply_name_fallbacks(parsed_list[i], texts[i])
+
+    return parsed_list
+
+
+def _extract_basic_entities(text):
+
     parsed = {
         "name": None,
         "email": None,
@@ -52,13 +181,8 @@ def extract_entities(text):
             parsed["phone"] = phone_match.group()
             break
 
-    # Extract Skills (enhanced matching)
-    skills_found = set()
-    for skill in SKILL_KEYWORDS:
-        # Use word boundaries for better matching
-        pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        if re.search(pattern, text_lower):
-            skills_found.add(skill.title())
+    # Extract Skills (single pass over the text)
+    skills_found = {skill.title() for skill in _skill_taxonomy.find(text_lower)}
 
     parsed["skills"] = sorted(list(skills_found))
 
@@ -74,38 +198,87 @@ def extract_entities(text):
 
     parsed["education"] = list(set(education_found))
 
-    # Extract Name using NER
-    IGNORED_HEADERS = {
-        "PROFESSIONAL SUMMARY", "SUMMARY", "OBJECTIVE", "EXPERIENCE",
-        "WORK EXPERIENCE", "EDUCATION", "SKILLS", "CONTACT", "PROJECTS",
-        "CERTIFICATIONS", "LANGUAGES", "REFERENCES", "RESUME", "CV",
-        "CURRICULUM VITAE", "ABOUT ME", "PROFILE", "PERSONAL PROFILE",
-        "CAREER SUMMARY", "TECHNICAL SKILLS", "KEY SKILLS"
-    }
+    return parsed
 
-    try:
-        ner = get_ner_pipeline()
-        # Use first 1000 chars for name extraction (usually at top)
-        ner_results = ner(text[:1000])
-        names = []
-
-        for ent in ner_results:
-            if ent["entity_group"] == "PER" and ent["score"] > 0.9:
-                # Filter out if the entity is a common header
-                if ent["word"].upper() not in IGNORED_HEADERS:
-                    names.append(ent["word"])
-
-        if names:
-            # Take first 2-3 name tokens
-            full_name = " ".join(names[:3])
-            # Clean up name
-            full_name = re.sub(r'\s+', ' ', full_name).strip()
-
-            # Final check against ignored headers
-            if full_name.upper() not in IGNORED_HEADERS:
-                parsed["name"] = full_name
-    except Exception as e:
-        logger.warning(f"NER extraction failed: {str(e)}")
+
+def _heuristic_name(text, email):
+    """Guess the name from the header lines and email, with a confidence in [0, 1]"""
+
+    email_parts = set()
+    if email:
+        email_parts = {p.lower() for p in re.split(r'[._\-]', email.split('@')[0])
+                       if len(p) >= 2 and not any(c.isdigit() for c in p)}
+
+    best_name, best_confidence = None, 0.0
+    non_empty_seen = 0
+
+    for line in text.split('\n')[:10]:
+        line = line.strip()
+        if not line:
+            continue
+        non_empty_seen += 1
+
+        words = line.split()
+        if not 2 <= len(words) <= 4 or _is_section_header(line):
+            continue
+        if not all(w[0].isupper() for w in words):
+            continue
+        # Names contain letters and the odd hyphen, apostrophe or initial dot
+        if not all(re.fullmatch(r"[^\W\d_][^\W\d_.'-]*[.'-]?[^\W\d_]*", w) for w in words):
+            continue
+
+        lowered = {w.strip(".'-").lower() for w in words}
+        if lowered & email_parts:
+            confidence = 1.0  # Header line agrees with the email address
+        elif lowered & JOB_TITLE_WORDS:
+            confidence = 0.3
+        elif non_empty_seen == 1:
+            # Title-cased first line; without the email agreeing, NER still confirms it
+            confidence = 0.75
+        else:
+            confidence = 0.6
+
+        if confidence > best_confidence:
+            best_name, best_confidence = line, confidence
+        if best_confidence >= 1.0:
+            break
+
+    if best_name is None and len(email_parts) >= 2:
+        # Only the email hints at a name, e.g. john.doe@example.com
+        return None, 0.5
+
+    return best_name, best_confidence
+
+
+def _is_section_header(line):
+    return (line.upper() in IGNORED_HEADERS or
+            any(w.strip(":").lower() in SECTION_HEADER_WORDS for w in line.split()))
+
+
+def _name_from_ner_results(ner_results):
+
+    names = []
+
+    for ent in ner_results:
+        if ent["entity_group"] == "PER" and ent["score"] > 0.9:
+            # Filter out if the entity is a common header
+            if ent["word"].upper() not in IGNORED_HEADERS:
+                names.append(ent["word"])
+
+    if names:
+        # Take first 2-3 name tokens
+        full_name = " ".join(names[:3])
+        # Clean up name
+        full_name = re.sub(r'\s+', ' ', full_name).strip()
+
+        # Final check against ignored headers
+        if full_name.upper() not in IGNORED_HEADERS:
+            return full_name
+
+    return None
+
+
+def _apply_name_fallbacks(parsed, text):
 
     # Fallback 1: try to extract name from first few lines if NER failed or returned ignored header
     if not parsed["name"] or parsed["name"].upper() in IGNORED_HEADERS:
@@ -120,7 +293,7 @@ def extract_entities(text):
             words = line.split()
             if 2 <= len(words) <= 4:
                 # Check if it's a header
-                if line.upper() in IGNORED_HEADERS:
+                if _is_section_header(line):
                     continue
 
                 # Check if mostly capitalized (Title Case or UPPER CASE)
@@ -143,17 +316,7 @@ def extract_entities(text):
         except Exception:
             pass
 
-    return parsed
-
 
 def extract_skills_from_job_description(job_description):
 
-    jd_lower = job_description.lower()
-    required_skills = set()
-
-    for skill in SKILL_KEYWORDS:
-        pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        if re.search(pattern, jd_lower):
-            required_skills.add(skill.lower())
-
-    return required_skills
+    return _skill_taxonomy.find(job_description)
@@ -0,0 +1,71 @@
+from typing import List, Dict, Any
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import PREFILTER_WEIGHTS
+from job_profile import JobProfile
+from parser import get_skill_taxonomy
+from utils import logger
+
+
+def compute_prefilter_scores(job_profile: JobProfile, resume_texts: List[str]) -> np.ndarray:
+    """
+    Cheap relevance score per resume: TF-IDF cosine against the job
+    description blended with the keyword skills match. No transformer
+    model is involved.
+    """
+
+    if not resume_texts:
+        return np.zeros(0)
+
+    # Fit on the request itself so no trained vocabulary is needed
+    vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+    try:
+        matrix = vectorizer.fit_transform(
+            [job_profile.description] + resume_texts)
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        tfidf_scores = (matrix[1:] @ matrix[0].T).toarray().ravel()
+    except ValueError as e:
+        # Raised when every document is empty or only stop words
+        logger.warning(f"TF-IDF prefilter unavailable: {str(e)}")
+        tfidf_scores = np.zeros(len(resume_texts))
+
+    required = job_profile.required_skills
+    taxonomy = get_skill_taxonomy()
+    if required:
+        skills_scores = np.array([
+            len(taxonomy.find(text) & required) / len(required)
+            for text in resume_texts
+        ])
+    else:
+        skills_scores = np.full(len(resume_texts), 0.5)
+
+    return (PREFILTER_WEIGHTS["tfidf_similarity"] * tfidf_scores +
+            PREFILTER_WEIGHTS["skills_match"] * skills_scores)
+
+
+def shortlist_resumes(
+    resumes_data: List[Dict[str, Any]],
+    job_profile: JobProfile,
+    shortlist_size: int
+) -> List[Dict[str, Any]]:
+    """Keep the `shortlist_size` most promising resumes, in their original order"""
+
+    # Pin each resume's position so results still report the original index
+    resumes_data = [{**resume_data, 'index': resume_data.get('index', i)}
+                    for i, resume_data in enumerate(resumes_data)]
+
+    if len(resumes_data) <= shortlist_size:
+        return resumes_data
+
+    scores = compute_prefilter_scores(
+        job_profile, [r.get('text', '') or '' for r in resumes_data])
+
+    # Stable sort keeps earlier resumes ahead on ties
+    keep = sorted(np.argsort(-scores, kind='stable')[:shortlist_size])
+
+    logger.info(
+        f"Prefilter shortlisted {len(keep)} of {len(resumes_data)} resumes")
+
+    return [resumes_data[i] for i in keep]
@@ -1,44 +1,247 @@
 
-from sentence_transformers import SentenceTransformer, util
-import torch
-from typing import List, Dict, Any
-from config import SENTENCE_TRANSFORMER_MODEL, WEIGHTS, DEFAULT_TOP_K
-from parser import extract_entities, extract_skills_from_job_description
+import atexit
+import heapq
+import os
+import threading
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+from config import (
+    SENTENCE_TRANSFORMER_MODEL, WEIGHTS, DEFAULT_TOP_K, EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_ENTRIES,
+    PREFILTER_SHORTLIST_SIZE, INFERENCE_SCHEDULER_ENABLED, INFERENCE_MAX_BATCH_SIZE,
+    INFERENCE_MAX_WAIT_MS, STREAM_BATCH_SIZE, EMBEDDING_BACKEND, ONNX_MODEL_DIR,
+    EMBEDDING_MAX_SEQ_LENGTH, RESUME_MAX_CHUNKS, RESUME_CHUNK_WORDS, RESUME_CHUNK_POOLING
+)
+from chunking import chunk_resume_texts
+from embedding_backend import load_embedding_backend
+from onnx_export import TORCH
+from embedding_store import EmbeddingStore
+from inference_scheduler import InferenceScheduler
+from job_profile import JobProfile, build_job_profile
+from parser import extract_entities_batch, normalize_skill
+from prefilter import shortlist_resumes
+from scoring import build_resume_batch, score_batch, score_matrix
 from utils import logger
 
 # Global model instance (lazy loading)
 _semantic_model = None
+_embedding_store = None
+_embedding_store_lock = threading.Lock()
+_inference_scheduler = None
+_inference_scheduler_lock = threading.Lock()
 
 
 def get_semantic_model():
-    """Lazy load Sentence Transformer model"""
+    """Lazy load Sentence Transformer model on the configured backend"""
     global _semantic_model
     if _semantic_model is None:
         logger.info(
-            f"Loading Sentence Transformer model: {SENTENCE_TRANSFORMER_MODEL}")
-        _semantic_model = SentenceTransformer(SENTENCE_TRANSFORMER_MODEL)
+            f"Loading Sentence Transformer model: {SENTENCE_TRANSFORMER_MODEL} ({EMBEDDING_BACKEND})")
+        _semantic_model = load_embedding_backend(
+            EMBEDDING_BACKEND, SENTENCE_TRANSFORMER_MODEL, ONNX_MODEL_DIR, EMBEDDING_MAX_SEQ_LENGTH)
         logger.info("Model loaded successfully")
     return _semantic_model
 
 
-def compute_semantic_similarity(text1: str, text2: str) -> float:
+def embedding_model_name() -> str:
+    """Identity of the vectors the active backend produces"""
+    model = get_semantic_model()
+    if model.name == TORCH:
+        return SENTENCE_TRANSFORMER_MODEL
+    return f"{SENTENCE_TRANSFORMER_MODEL}@{model.name}"
 
-    try:
-        model = get_semantic_model()
 
-        # Encode texts
-        embedding1 = model.encode(text1, convert_to_tensor=True)
-        embedding2 = model.encode(text2, convert_to_tensor=True)
+def resume_embedding_signature() -> str:
+    """How encode_resume_texts builds resume vectors (model and chunking mode)"""
+    if RESUME_MAX_CHUNKS <= 0:
+        mode = "whole"
+    else:
+        mode = f"mean-of-{RESUME_MAX_CHUNKS}x{RESUME_CHUNK_WORDS}-word-chunks"
+    return f"{embedding_model_name()}|{mode}"
+
+
+def get_embedding_store():
+    """Lazy open the on-disk embedding cache (None when disabled)"""
+    global _embedding_store
+    if _embedding_store is None and EMBEDDING_CACHE_ENABLED:
+        with _embedding_store_lock:
+            if _embedding_store is None:
+                try:
+                    model = get_semantic_model()
+                    # Backends produce slightly different vectors, so each gets its own cache
+                    directory = EMBEDDING_CACHE_DIR
+                    if model.name != TORCH:
+                        directory = os.path.join(EMBEDDING_CACHE_DIR, model.name)
+                    _embedding_store = EmbeddingStore(
+                        directory,
+                        embedding_model_name(),
+                        model.get_sentence_embedding_dimension(),
+                        EMBEDDING_CACHE_MAX_ENTRIES
+                    )
+                    atexit.register(_embedding_store.flush)
+                except Exception as e:
+                    logger.error(f"Embedding cache unavailable: {str(e)}")
+                    return None
+    return _embedding_store
+
+
+def get_inference_scheduler():
+    """Lazy create the shared micro-batching scheduler"""
+    global _inference_scheduler
+    with _inference_scheduler_lock:
+        if _inference_scheduler is None:
+            model = get_semantic_model()
+            _inference_scheduler = InferenceScheduler(
+                lambda texts: model.encode(
+                    texts, batch_size=EMBEDDING_BATCH_SIZE, normalize_embeddings=True),
+                INFERENCE_MAX_BATCH_SIZE,
+                INFERENCE_MAX_WAIT_MS
+            )
+    return _inference_scheduler
+
+
+def encode_texts(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> np.ndarray:
+    """Normalized embeddings, micro-batched with other requests when enabled"""
+    if INFERENCE_SCHEDULER_ENABLED:
+        return get_inference_scheduler().encode(texts)
+    return get_semantic_model().encode(
+        texts, batch_size=batch_size, normalize_embeddings=True)
+
+
+def encode_cached_texts(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> np.ndarray:
+    """Return normalized embeddings, encoding only texts missing from the cache"""
+
+    store = get_embedding_store()
+
+    if store is None:
+        return encode_texts(texts, batch_size)
+
+    keys = [store.make_key(text) for text in texts]
+    embeddings = store.get_many(keys)
+
+    # Encode each unseen text once, even if it repeats within the request
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in embeddings:
+            missing.setdefault(key, text)
+
+    if missing:
+        new_embeddings = encode_texts(list(missing.values()), batch_size)
+        new_vectors = dict(zip(missing.keys(), new_embeddings))
+        store.put_many(new_vectors)
+        embeddings.update(new_vectors)
+
+    logger.info(
+        f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} encoded")
+
+    return np.vstack([embeddings[key] for key in keys]).astype(np.float32)
+
+
+def encode_resume_texts(
+    resume_texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> np.ndarray:
+    """
+    One normalized embedding per resume. In chunked mode this is the
+    normalized mean of its chunk embeddings, used where a single vector per
+    resume is stored (the corpus index), so corpus scores are mean-pooled
+    even when live ranking pools chunk scores by max.
+    """
+
+    if RESUME_MAX_CHUNKS <= 0:
+        return encode_cached_texts(resume_texts, batch_size)
+
+    chunks, offsets = chunk_resume_texts(resume_texts, RESUME_MAX_CHUNKS, RESUME_CHUNK_WORDS)
+    chunk_embeddings = encode_cached_texts(chunks, batch_size)
+
+    counts = np.diff(offsets + [len(chunks)])[:, None]
+    pooled = np.add.reduceat(chunk_embeddings, offsets, axis=0) / counts
+    pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled.astype(np.float32)
 
-        # Compute cosine similarity
-        similarity = util.cos_sim(embedding1, embedding2)
 
-        return float(similarity.item())
+def compute_resume_similarities(
+    job_embeddings: np.ndarray,
+    resume_texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> np.ndarray:
+    """
+    Job x resume cosine similarities. In chunked mode every chunk of every
+    resume is encoded in one batch and each resume's chunk scores are
+    pooled (max or mean) per job description.
+    """
+
+    if RESUME_MAX_CHUNKS <= 0:
+        return job_embeddings @ encode_resume_texts(resume_texts, batch_size).T
+
+    chunks, offsets = chunk_resume_texts(resume_texts, RESUME_MAX_CHUNKS, RESUME_CHUNK_WORDS)
+    logger.info(f"Encoding {len(chunks)} chunks of {len(resume_texts)} resumes")
+
+    chunk_scores = job_embeddings @ encode_cached_texts(chunks, batch_size).T
+
+    if RESUME_CHUNK_POOLING == "mean":
+        counts = np.diff(offsets + [len(chunks)])
+        return np.add.reduceat(chunk_scores, offsets, axis=1) / counts
+    return np.maximum.reduceat(chunk_scores, offsets, axis=1)
+
+
+def compute_semantic_similarity(text1: str, text2: str) -> float:
+
+    try:
+        # Encode both texts in one pass
+        embeddings = encode_texts([text1, text2])
+
+        # Normalized embeddings: the dot product is the cosine similarity
+        return float(embeddings[0] @ embeddings[1])
     except Exception as e:
         logger.error(f"Error computing semantic similarity: {str(e)}")
         return 0.0
 
 
+def get_job_embedding(job_profile: JobProfile) -> np.ndarray:
+    """Normalized job description embedding, computed once per profile"""
+    if job_profile.embedding is None:
+        job_profile.embedding = encode_texts([job_profile.description])[0]
+    return job_profile.embedding
+
+
+def get_job_embeddings(job_profiles: List[JobProfile]) -> np.ndarray:
+    """Embeddings of many job descriptions, encoding the missing ones in one call"""
+    missing = [p for p in job_profiles if p.embedding is None]
+    if missing:
+        for profile, embedding in zip(missing, encode_texts([p.description for p in missing])):
+            profile.embedding = embedding
+    return np.vstack([p.embedding for p in job_profiles]).astype(np.float32)
+
+
+def compute_semantic_similarities(
+    job_profile: JobProfile,
+    resume_texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> List[float]:
+    """Score many resumes against one job description in batched passes"""
+
+    if not resume_texts:
+        return []
+
+    try:
+        # Encode the job description once, resumes in batches (or from cache)
+        jd_embedding = get_job_embedding(job_profile)
+
+        # Embeddings are unit length, so one matrix-vector product gives cosines
+        similarities = compute_resume_similarities(
+            jd_embedding[None, :], resume_texts, batch_size)[0]
+
+        return [float(score) for score in similarities]
+    except Exception as e:
+        logger.error(f"Error computing batched semantic similarity: {str(e)}")
+        return [0.0] * len(resume_texts)
+
+
 def compute_skills_match_score(resume_skills: List[str], required_skills: set) -> float:
 
     if not required_skills:
@@ -47,8 +250,8 @@ def compute_skills_match_score(resume_skills: List[str], required_skills: set) -
     if not resume_skills:
         return 0.0
 
-    # Convert resume skills to lowercase for comparison
-    resume_skills_lower = set(skill.lower() for skill in resume_skills)
+    # Convert resume skills to canonical lowercase names for comparison
+    resume_skills_lower = set(normalize_skill(skill) for skill in resume_skills)
 
     # Calculate intersection
     matched_skills = resume_skills_lower.intersection(required_skills)
@@ -59,28 +262,9 @@ def compute_skills_match_score(resume_skills: List[str], required_skills: set) -
     return min(score, 1.0)
 
 
-def compute_experience_match_score(years_of_experience: float, job_description: str) -> float:
-
-    import re
-
-    # Try to extract required years from job description
-    patterns = [
-        r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-        r'(\d+)\+?\s*yrs?\s+experience',
-        r'minimum\s+(\d+)\s+years?',
-    ]
-
-    required_years = None
-    jd_lower = job_description.lower()
+def compute_experience_match_score(years_of_experience: float, job_profile: JobProfile) -> float:
 
-    for pattern in patterns:
-        match = re.search(pattern, jd_lower)
-        if match:
-            try:
-                required_years = float(match.group(1))
-                break
-            except ValueError:
-                pass
+    required_years = job_profile.required_years
 
     if required_years is None:
         # No specific requirement found, give partial credit based on experience
@@ -123,85 +307,346 @@ def compute_composite_score(
     return composite * 100  # Convert to percentage
 
 
-def rank_resumes(
-    resumes_data: List[Dict[str, Any]],
-    job_description: str,
-    top_k: int = DEFAULT_TOP_K
-) -> List[Dict[str, Any]]:
+@dataclass
+class ScoredResume:
+    """Scores and parsed entities for one resume, before the result dict is built"""
 
-    logger.info(f"Ranking {len(resumes_data)} resumes")
+    index: int
+    match_score: float
+    semantic_score: float
+    skills_score: float
+    experience_score: float
+    entities: Dict[str, Any]
+
+
+def build_result(scored: ScoredResume, job_profile: JobProfile) -> Dict[str, Any]:
+
+    entities = scored.entities
+
+    return {
+        "index": scored.index,
+        "name": entities.get('name', 'Unknown'),
+        "email": entities.get('email', 'N/A'),
+        "phone": entities.get('phone', 'N/A'),
+        "skills": entities.get('skills', []),
+        "years_of_experience": entities.get('years_of_experience', 0.0),
+        "education": entities.get('education', []),
+        "match_score": scored.match_score,
+        "score_breakdown": {
+            "semantic_similarity": round(scored.semantic_score * 100, 2),
+            "skills_match": round(scored.skills_score * 100, 2),
+            "experience_match": round(scored.experience_score * 100, 2)
+        },
+        "matched_skills": list(set(entities.get('skills', [])).intersection(
+            job_profile.required_skills_titled
+        ))
+    }
+
+
+def score_resumes(
+    resumes: Iterable[Dict[str, Any]],
+    job_profile: JobProfile,
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> Iterator[ScoredResume]:
+    """
+    Score resumes lazily, `batch_size` at a time.
+
+    Only one chunk of resume text is held at once, so `resumes` can be a
+    generator over a pool of any size. Resumes that already carry parsed
+    'entities' skip NER.
+    """
+
+    chunk = []
+
+    for idx, resume_data in enumerate(resumes):
+        resume_text = resume_data.get('text', '')
+
+        if not resume_text or len(resume_text.strip()) < 50:
+            logger.warning(f"Resume {idx} has insufficient text, skipping")
+            continue
 
-    # Extract required skills from job description
-    required_skills = extract_skills_from_job_description(job_description)
-    logger.info(f"Required skills identified: {required_skills}")
+        chunk.append((idx, resume_data))
 
-    ranked_results = []
+        if len(chunk) >= batch_size:
+            yield from _score_chunk(chunk, job_profile, batch_size)
+            chunk = []
 
-    for idx, resume_data in enumerate(resumes_data):
-        try:
-            resume_text = resume_data.get('text', '')
+    if chunk:
+        yield from _score_chunk(chunk, job_profile, batch_size)
 
-            if not resume_text or len(resume_text.strip()) < 50:
-                logger.warning(f"Resume {idx} has insufficient text, skipping")
-                continue
 
-            # Extract entities
-            entities = extract_entities(resume_text)
+def _score_chunk(chunk, job_profile, batch_size):
 
-            # Compute semantic similarity
-            semantic_score = compute_semantic_similarity(
-                job_description, resume_text)
+    texts = [resume_data['text'] for _, resume_data in chunk]
 
-            # Compute skills match
-            skills_score = compute_skills_match_score(
-                entities['skills'], required_skills)
+    # Compute semantic similarity for the whole chunk at once
+    semantic_scores = compute_semantic_similarities(
+        job_profile, texts, batch_size)
 
-            # Compute experience match
-            experience_score = compute_experience_match_score(
-                entities['years_of_experience'],
-                job_description
-            )
+    # Extract entities with batched NER, except for resumes parsed earlier
+    entities_list = [resume_data.get('entities') for _, resume_data in chunk]
+    unparsed = [i for i, entities in enumerate(entities_list) if entities is None]
+    if unparsed:
+        for i, entities in zip(unparsed, extract_entities_batch([texts[i] for i in unparsed])):
+            entities_list[i] = entities
 
-            # Compute composite score
-            final_score = compute_composite_score(
-                semantic_score,
-                skills_score,
-                experience_score
-            )
+    try:
+        yield from score_parsed_batch(
+            [resume_data.get('index', idx) for idx, resume_data in chunk],
+            semantic_scores, entities_list, job_profile)
+        return
+    except Exception as e:
+        logger.error(f"Vectorized scoring failed, scoring one by one: {str(e)}")
 
-            # Build result
-            result = {
-                "index": resume_data.get('index', idx),
-                "name": entities.get('name', 'Unknown'),
-                "email": entities.get('email', 'N/A'),
-                "phone": entities.get('phone', 'N/A'),
-                "skills": entities.get('skills', []),
-                "years_of_experience": entities.get('years_of_experience', 0.0),
-                "education": entities.get('education', []),
-                "match_score": round(final_score, 2),
-                "score_breakdown": {
-                    "semantic_similarity": round(semantic_score * 100, 2),
-                    "skills_match": round(skills_score * 100, 2),
-                    "experience_match": round(experience_score * 100, 2)
-                },
-                "matched_skills": list(set(entities.get('skills', [])).intersection(
-                    set(s.title() for s in required_skills)
-                ))
-            }
-
-            ranked_results.append(result)
+    for (idx, resume_data), semantic_score, entities in zip(
+            chunk, semantic_scores, entities_list):
+        try:
+            yield score_parsed_resume(
+                resume_data.get('index', idx), semantic_score, entities, job_profile)
 
         except Exception as e:
             logger.error(f"Error processing resume {idx}: {str(e)}")
             continue
 
-    # Sort by match score (descending)
-    ranked_results.sort(key=lambda x: x['match_score'], reverse=True)
 
-    # Return top K
-    top_results = ranked_results[:top_k]
+def score_parsed_resume(
+    index: int,
+    semantic_score: float,
+    entities: Dict[str, Any],
+    job_profile: JobProfile
+) -> ScoredResume:
+    """Combine a semantic score with the skills and experience of parsed entities"""
+
+    # Compute skills match
+    skills_score = compute_skills_match_score(
+        entities['skills'], job_profile.required_skills)
+
+    # Compute experience match
+    experience_score = compute_experience_match_score(
+        entities['years_of_experience'],
+        job_profile
+    )
+
+    # Compute composite score
+    final_score = compute_composite_score(
+        semantic_score,
+        skills_score,
+        experience_score
+    )
+
+    return ScoredResume(
+        index=index,
+        match_score=round(final_score, 2),
+        semantic_score=semantic_score,
+        skills_score=skills_score,
+        experience_score=experience_score,
+        entities=entities
+    )
+
+
+def score_parsed_batch(
+    indices: List[int],
+    semantic_scores: Sequence[float],
+    entities_list: List[Dict[str, Any]],
+    job_profile: JobProfile
+) -> List[ScoredResume]:
+    """score_parsed_resume for a whole batch, computed with NumPy in one pass"""
+
+    if not indices:
+        return []
+
+    semantic = np.asarray(semantic_scores, dtype=np.float64)
+    composite, skills, experience = score_batch(
+        semantic, build_resume_batch(entities_list), job_profile)
+
+    return [ScoredResume(
+        index=index,
+        match_score=round(float(composite[i]), 2),
+        semantic_score=float(semantic[i]),
+        skills_score=float(skills[i]),
+        experience_score=float(experience[i]),
+        entities=entities_list[i]
+    ) for i, index in enumerate(indices)]
+
+
+class TopKSelector:
+    """Incrementally keep the best `top_k` scored resumes in a min-heap"""
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.total_scored = 0
+        # Heap entries are (score, -position, resume): the root is the weakest
+        # candidate, and among equal scores the one that arrived last
+        self._heap = []
+
+    def push(self, scored: ScoredResume):
+        entry = (scored.match_score, -self.total_scored, scored)
+        self.total_scored += 1
+
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        elif self.top_k > 0:
+            heapq.heappushpop(self._heap, entry)
+
+    def survivors(self) -> List[ScoredResume]:
+        """Highest score first, ties in arrival order"""
+        return [scored for _, _, scored in sorted(self._heap, reverse=True)]
+
+
+def select_top_k(scored_resumes: Iterable[ScoredResume], top_k: int) -> Tuple[List[ScoredResume], int]:
+    """
+    Keep the best `top_k` of a stream in a min-heap.
+
+    Returns the survivors (highest score first, ties in arrival order) and
+    how many resumes were seen.
+    """
+
+    selector = TopKSelector(top_k)
+    for scored in scored_resumes:
+        selector.push(scored)
+
+    return selector.survivors(), selector.total_scored
+
 
+def rank_resumes_stream(
+    resumes: Iterable[Dict[str, Any]],
+    job_description: str,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank a stream of resumes keeping only the best `top_k` in a min-heap.
+
+    Returns the ranked results and the number of resumes scored. Result
+    dicts are only built for the survivors, so memory stays flat however
+    large the pool is.
+    """
+
+    # Everything derived from the job description is computed once
+    job_profile = build_job_profile(job_description)
     logger.info(
-        f"Ranking complete. Returning top {len(top_results)} candidates")
+        f"Required skills identified: {job_profile.required_skills}")
+
+    survivors, total_scored = select_top_k(
+        score_resumes(resumes, job_profile, batch_size), top_k)
+
+    top_results = [build_result(scored, job_profile) for scored in survivors]
+
+    logger.info(
+        f"Ranking complete. Scored {total_scored} resumes, returning top {len(top_results)} candidates")
+
+    return top_results, total_scored
+
+
+def rank_resumes_progressive(
+    resumes: Iterable[Dict[str, Any]],
+    job_description: str,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Rank a stream of resumes, yielding events as soon as they are known:
+    {"type": "resume", "resume": result} for every scored resume, then one
+    {"type": "summary", "ranked_resumes": [...], "total_resumes_processed": n}.
+    Small batches trade some throughput for earlier first results.
+    """
+
+    job_profile = build_job_profile(job_description)
+    selector = TopKSelector(top_k)
+
+    for scored in score_resumes(resumes, job_profile, batch_size):
+        selector.push(scored)
+        yield {"type": "resume", "resume": build_result(scored, job_profile)}
+
+    yield {
+        "type": "summary",
+        "ranked_resumes": [build_result(s, job_profile) for s in selector.survivors()],
+        "total_resumes_processed": selector.total_scored
+    }
+
+
+def rank_resumes(
+    resumes_data: List[Dict[str, Any]],
+    job_description: str,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    shortlist_size: Optional[int] = PREFILTER_SHORTLIST_SIZE
+) -> List[Dict[str, Any]]:
+
+    logger.info(f"Ranking {len(resumes_data)} resumes")
+
+    # Two-stage mode: only the prefilter shortlist gets NER and embeddings
+    if shortlist_size:
+        resumes_data = shortlist_resumes(
+            resumes_data, build_job_profile(job_description), max(shortlist_size, top_k))
+
+    top_results, _ = rank_resumes_stream(
+        resumes_data, job_description, top_k, batch_size)
 
     return top_results
+
+
+def rank_resumes_multi(
+    resumes_data: List[Dict[str, Any]],
+    job_descriptions: List[str],
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = EMBEDDING_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Rank one resume pool against many job descriptions.
+
+    Resumes are parsed and embedded once and all job descriptions are
+    embedded in one call; the vectorized scoring engine then computes the
+    job x resume score matrices. Returns one entry per job description, in
+    order, with its own top-k list.
+    """
+
+    job_profiles = [build_job_profile(jd) for jd in job_descriptions]
+
+    resumes = [(i, r) for i, r in enumerate(resumes_data)
+               if r.get('text') and len(r['text'].strip()) >= 50]
+    logger.info(
+        f"Ranking {len(resumes)} resumes against {len(job_profiles)} job descriptions")
+
+    if not resumes:
+        return [{"job_index": j, "total_resumes_processed": 0, "top_candidates": 0, "ranked_resumes": []}
+                for j in range(len(job_profiles))]
+
+    texts = [r['text'] for _, r in resumes]
+
+    # Parse every resume once (reusing stored entities where present)
+    entities_list = [r.get('entities') for _, r in resumes]
+    unparsed = [i for i, entities in enumerate(entities_list) if entities is None]
+    if unparsed:
+        for i, entities in zip(unparsed, extract_entities_batch([texts[i] for i in unparsed])):
+            entities_list[i] = entities
+
+    # Semantic scores: unit embeddings, so one matrix product gives every cosine
+    semantic = compute_resume_similarities(
+        get_job_embeddings(job_profiles), texts, batch_size).astype(np.float64)
+
+    composite, skills, experience = score_matrix(
+        semantic, build_resume_batch(entities_list), job_profiles)
+
+    results = []
+    positions = np.arange(len(resumes))
+    for j, profile in enumerate(job_profiles):
+        # Highest rounded score first, ties in pool order (as select_top_k)
+        order = np.lexsort((positions, -np.round(composite[j], 2)))[:top_k]
+        ranked = [build_result(ScoredResume(
+            index=resumes[r][1].get('index', resumes[r][0]),
+            match_score=round(float(composite[j, r]), 2),
+            semantic_score=float(semantic[j, r]),
+            skills_score=float(skills[j, r]),
+            experience_score=float(experience[j, r]),
+            entities=entities_list[r]
+        ), profile) for r in order]
+
+        results.append({
+            "job_index": j,
+            "total_resumes_processed": len(resumes),
+            "top_candidates": len(ranked),
+            "ranked_resumes": ranked
+        })
+
+    return results
@@ -0,0 +1,248 @@
+"""
+Where resume files come from: multipart uploads, base64 JSON payloads and
+S3 prefixes. Every source yields ResumeDocument objects carrying the raw
+file bytes, which go straight to the extractor. Only the JSON source ever
+decodes base64.
+"""
+import base64
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from config import S3_FETCH_CONCURRENCY, S3_ENDPOINT_URL
+from extractor import extract_texts, iter_extract_texts
+from utils import logger
+
+
+@dataclass
+class ResumeDocument:
+    """One resume file before text extraction"""
+
+    index: int
+    data: Union[bytes, memoryview]
+    file_type: str
+    filename: Optional[str] = None
+
+
+def detect_file_type(filename: str) -> Optional[str]:
+    """'pdf' or 'docx' from the file extension, None if unsupported"""
+    filename = filename.lower()
+    if filename.endswith('.pdf'):
+        return 'pdf'
+    if filename.endswith('.docx'):
+        return 'docx'
+    return None
+
+
+def uploaded_file_documents(files) -> List[ResumeDocument]:
+    """Read Flask/Werkzeug uploads, skipping empty or unsupported files"""
+
+    documents = []
+
+    for i, file in enumerate(files):
+        try:
+            if not file or file.filename == '':
+                logger.warning(f"Resume {i}: Empty file")
+                continue
+
+            filename = file.filename.lower()
+            file_type = detect_file_type(filename)
+            if file_type is None:
+                logger.warning(
+                    f"Resume {i}: Unsupported file type - {filename}")
+                continue
+
+            file_bytes = file.read()
+
+            if len(file_bytes) == 0:
+                logger.warning(f"Resume {i}: Empty file content")
+                continue
+
+            documents.append(ResumeDocument(i, file_bytes, file_type, filename))
+
+        except Exception as e:
+            logger.error(f"Error processing resume {i}: {str(e)}")
+            continue
+
+    return documents
+
+
+def multipart_part_document(index: int, part, content_disposition: str) -> ResumeDocument:
+    """Wrap a requests-toolbelt multipart part without copying its content"""
+
+    # Extract filename from Content-Disposition header
+    filename = "unknown.pdf"
+    if 'filename="' in content_disposition:
+        filename = content_disposition.split('filename="')[1].split('"')[0]
+    elif "filename='" in content_disposition:
+        filename = content_disposition.split("filename='")[1].split("'")[0]
+
+    file_type = 'docx' if filename.lower().endswith('.docx') else 'pdf'
+
+    return ResumeDocument(index, part.content, file_type, filename)
+
+
+def base64_documents(resumes: List[Dict[str, Any]]) -> List[ResumeDocument]:
+    """Decode JSON resume payloads ({'file_base64', 'file_type'})"""
+
+    documents = []
+
+    for i, resume in enumerate(resumes):
+        try:
+            file_base64 = resume['file_base64']
+            file_type = resume.get('file_type', 'pdf')
+
+            # Decode base64
+            file_bytes = base64.b64decode(file_base64)
+
+            documents.append(ResumeDocument(
+                i, file_bytes, file_type, resume.get('filename')))
+
+        except Exception as e:
+            logger.error(f"Error processing resume {i}: {str(e)}")
+            continue
+
+    return documents
+
+
+def list_s3_resume_objects(s3_client, bucket: str, prefix: str) -> List[Tuple[str, str]]:
+    """(key, ETag) of every PDF/DOCX object under the prefix"""
+    objects = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(Bucket=bucket, Prefix=prefix)
+
+    for page in pages:
+        if 'Contents' in page:
+            for obj in page['Contents']:
+                key = obj['Key']
+                if key.endswith('/') or detect_file_type(key) is None:
+                    continue
+                objects.append((key, obj.get('ETag', '')))
+
+    return objects
+
+
+def list_s3_resume_keys(s3_client, bucket: str, prefix: str) -> List[str]:
+    """Keys of every PDF/DOCX object under the prefix"""
+    return [key for key, _ in list_s3_resume_objects(s3_client, bucket, prefix)]
+
+
+def make_s3_client(max_connections: int = S3_FETCH_CONCURRENCY, endpoint_url: Optional[str] = S3_ENDPOINT_URL):
+    """S3 client whose HTTP connection pool fits the fetch concurrency"""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=max(max_connections, 10)))
+
+
+def _fetch_s3_document(s3_client, bucket, index, key):
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    return ResumeDocument(index, response['Body'].read(), detect_file_type(key), key)
+
+
+def iter_s3_documents(
+    s3_client,
+    bucket: str,
+    keys: List[str],
+    concurrency: int = S3_FETCH_CONCURRENCY,
+    on_error: Optional[Callable[[str], None]] = None
+) -> Iterator[ResumeDocument]:
+    """
+    Download S3 resumes on a thread pool, yielding them in key order.
+
+    At most `concurrency` objects are in flight or buffered at once, so
+    memory stays bounded while the consumer extracts earlier files.
+    Objects that fail to download are logged, passed to `on_error` and
+    skipped.
+    """
+    if not keys:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        in_flight = deque()
+        key_iter = iter(enumerate(keys))
+
+        def submit_next():
+            for i, key in key_iter:
+                in_flight.append((key, executor.submit(
+                    _fetch_s3_document, s3_client, bucket, i, key)))
+                return
+
+        for _ in range(max(1, concurrency)):
+            submit_next()
+
+        try:
+            while in_flight:
+                key, future = in_flight.popleft()
+                submit_next()
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error(f"Error downloading S3 resume {key}: {str(e)}")
+                    if on_error is not None:
+                        on_error(key)
+        finally:
+            # Consumer stopped early: drop downloads that have not started
+            for _, future in in_flight:
+                future.cancel()
+
+
+def extract_resumes(documents: List[ResumeDocument]) -> List[Dict[str, Any]]:
+    """Extract text from documents in parallel, dropping ones without enough text"""
+
+    texts = extract_texts([(d.data, d.file_type) for d in documents])
+
+    resumes_data = []
+
+    for document, text in zip(documents, texts):
+        if not text or len(text.strip()) < 50:
+            logger.warning(
+                f"Resume {document.index} ({document.filename}): Insufficient text content")
+            continue
+
+        resumes_data.append({
+            'index': document.index,
+            'text': text,
+            'file_type': document.file_type,
+            'filename': document.filename
+        })
+
+    return resumes_data
+
+
+def iter_extracted_resumes(
+    documents: Iterable[ResumeDocument],
+    progress: Optional[Callable[[], None]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Extract documents as they arrive, dropping ones without enough text.
+    Parsing runs on the process pool while the source keeps producing.
+    `progress` is called once per document as its extraction finishes,
+    whether or not it produced usable text.
+    """
+    seen = deque()
+
+    def remember(documents):
+        for document in documents:
+            seen.append(document)
+            yield document.data, document.file_type
+
+    for text in iter_extract_texts(remember(documents)):
+        document = seen.popleft()
+        if progress is not None:
+            progress()
+        if not text or len(text.strip()) < 50:
+            logger.warning(
+                f"Resume {document.index} ({document.filename}): Insufficient text content")
+            continue
+
+        yield {
+            'index': document.index,
+            'text': text,
+            'file_type': document.file_type,
+            'filename': document.filename
+        }
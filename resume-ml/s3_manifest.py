@@ -0,0 +1,261 @@
+"""
+Per-prefix cache of parsed S3 resumes keyed by ETag.
+
+Each manifest maps object key -> {etag, text, entities} for one
+bucket/prefix. It lives in S3_MANIFEST_DIR so warm Lambda containers
+reuse it, and is optionally mirrored to a sidecar object in the bucket
+so cold containers start warm too. Embeddings need no entry here: they
+are content-addressed in the embedding store.
+
+A manifest is only used by a parser with the same settings (skill
+taxonomy, name extraction mode, NER model and backend); otherwise it is
+rebuilt. Objects without usable text are retried after
+S3_MANIFEST_FAILURE_TTL seconds, since the failure may have been a
+timeout rather than a bad file.
+
+Each bucket/prefix has its own lock, held only while the manifest is
+read or written; downloads, extraction and parsing run unlocked, so
+requests for other prefixes, or for the same one, proceed in parallel.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    S3_MANIFEST_DIR, S3_MANIFEST_SIDECAR_KEY, S3_MANIFEST_FAILURE_TTL, EMBEDDING_BATCH_SIZE,
+    NAME_EXTRACTION_MODE, NAME_HEURISTIC_MIN_CONFIDENCE, NER_MODEL, NER_BACKEND
+)
+from parser import extract_entities_batch, get_skill_taxonomy
+from resume_sources import detect_file_type, iter_s3_documents, iter_extracted_resumes
+from utils import logger
+
+MANIFEST_VERSION = 4  # Bumped when name or skill parsing changes
+
+
+def parser_fingerprint() -> str:
+    """Digest of every setting that changes the cached entities"""
+    settings = [get_skill_taxonomy().fingerprint(), NAME_EXTRACTION_MODE,
+                NAME_HEURISTIC_MIN_CONFIDENCE, NER_MODEL, NER_BACKEND]
+    return hashlib.sha256(json.dumps(settings).encode('utf-8')).hexdigest()
+
+
+class S3Manifest:
+    """Parsed resumes of one bucket/prefix, valid while their ETag matches"""
+
+    def __init__(self, bucket: str, prefix: str, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.entries = entries or {}
+        self.dirty = False
+
+    def get(self, key: str, etag: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or entry.get('etag') != etag:
+            return None
+        if entry['text'] is None and time.time() - entry.get('failed_at', 0) > S3_MANIFEST_FAILURE_TTL:
+            return None
+        return entry
+
+    def put(self, key: str, etag: str, text: Optional[str], entities: Optional[Dict[str, Any]]):
+        entry = {'etag': etag, 'text': text, 'entities': entities}
+        if text is None:
+            # Unreadable files are not fetched again until the failure expires
+            entry['failed_at'] = time.time()
+        self.entries[key] = entry
+        self.dirty = True
+
+    def prune(self, keys):
+        """Forget objects that are no longer under the prefix"""
+        keys = set(keys)
+        for key in [k for k in self.entries if k not in keys]:
+            del self.entries[key]
+            self.dirty = True
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': MANIFEST_VERSION,
+            'parser': parser_fingerprint(),
+            'bucket': self.bucket,
+            'prefix': self.prefix,
+            'entries': self.entries
+        })
+
+    @classmethod
+    def from_json(cls, bucket: str, prefix: str, payload) -> Optional["S3Manifest"]:
+        data = json.loads(payload)
+        if (data.get('version') != MANIFEST_VERSION or data.get('parser') != parser_fingerprint()
+                or data.get('bucket') != bucket or data.get('prefix') != prefix):
+            return None
+        return cls(bucket, prefix, data.get('entries', {}))
+
+
+_manifest_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_manifest_locks_lock = threading.Lock()
+
+
+def _manifest_lock(bucket, prefix) -> threading.Lock:
+    with _manifest_locks_lock:
+        return _manifest_locks.setdefault((bucket, prefix), threading.Lock())
+
+
+def _local_path(bucket, prefix):
+    name = hashlib.sha256(f"{bucket}\0{prefix}".encode('utf-8')).hexdigest()
+    return os.path.join(S3_MANIFEST_DIR, f"{name}.json")
+
+
+def _sidecar_key(prefix):
+    return f"{prefix}{S3_MANIFEST_SIDECAR_KEY}"
+
+
+def load_manifest(s3_client, bucket: str, prefix: str) -> S3Manifest:
+    """Local manifest if present, else the sidecar object, else an empty one"""
+    path = _local_path(bucket, prefix)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = S3Manifest.from_json(bucket, prefix, f.read())
+        if manifest is not None:
+            return manifest
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable S3 manifest {path}: {str(e)}")
+
+    if S3_MANIFEST_SIDECAR_KEY:
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=_sidecar_key(prefix))
+            manifest = S3Manifest.from_json(bucket, prefix, response['Body'].read())
+            if manifest is not None:
+                logger.info(
+                    f"Loaded S3 manifest with {len(manifest.entries)} entries from sidecar")
+                _write_local(manifest, manifest.to_json())
+                return manifest
+        except Exception as e:
+            logger.info(f"No usable S3 manifest sidecar: {str(e)}")
+
+    return S3Manifest(bucket, prefix)
+
+
+def _write_local(manifest, payload):
+    path = _local_path(manifest.bucket, manifest.prefix)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"S3 manifest write failed for {path}: {str(e)}")
+
+
+def save_manifest(s3_client, manifest: S3Manifest):
+    if not manifest.dirty:
+        return
+
+    payload = manifest.to_json()
+    _write_local(manifest, payload)
+
+    if S3_MANIFEST_SIDECAR_KEY:
+        try:
+            s3_client.put_object(
+                Bucket=manifest.bucket, Key=_sidecar_key(manifest.prefix),
+                Body=payload.encode('utf-8'), ContentType='application/json')
+        except Exception as e:
+            logger.warning(f"S3 manifest sidecar upload failed: {str(e)}")
+
+    manifest.dirty = False
+
+
+def load_s3_resumes(
+    s3_client,
+    bucket: str,
+    prefix: str,
+    objects: List[Tuple[str, str]],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress: Optional[Callable[[], None]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Resume dicts with text and entities for every (key, ETag) in `objects`.
+
+    Only objects that are new or whose ETag changed are downloaded,
+    extracted and parsed; everything else comes from the manifest.
+    `progress` is called once per object: cached ones up front, the rest
+    as they are extracted or fail to download.
+    """
+
+    lock = _manifest_lock(bucket, prefix)
+    with lock:
+        cached = load_manifest(s3_client, bucket, prefix)
+
+    stale = [(key, etag) for key, etag in objects
+             if cached.get(key, etag) is None]
+    logger.info(
+        f"S3 manifest: {len(objects) - len(stale)} cached, {len(stale)} to fetch")
+
+    if progress is not None:
+        for _ in range(len(objects) - len(stale)):
+            progress()
+
+    parsed = {}  # key -> (text, entities); text is None for unusable files
+    if stale:
+        downloaded = set()
+
+        def track(documents):
+            for document in documents:
+                downloaded.add(document.filename)
+                yield document
+
+        def parse_chunk(chunk):
+            for resume, entities in zip(chunk, extract_entities_batch([r['text'] for r in chunk])):
+                parsed[resume['filename']] = (resume['text'], entities)
+
+        def on_error(key):
+            if progress is not None:
+                progress()
+
+        chunk = []
+        documents = track(iter_s3_documents(
+            s3_client, bucket, [key for key, _ in stale], on_error=on_error))
+        for resume in iter_extracted_resumes(documents, progress):
+            chunk.append(resume)
+            if len(chunk) >= batch_size:
+                parse_chunk(chunk)
+                chunk = []
+        if chunk:
+            parse_chunk(chunk)
+
+        # Files without usable text are remembered; failed downloads are retried
+        for key, _ in stale:
+            if key in downloaded and key not in parsed:
+                parsed[key] = (None, None)
+
+    with lock:
+        # Re-read so entries written by concurrent requests are kept
+        manifest = load_manifest(s3_client, bucket, prefix)
+        etags = dict(objects)
+        for key, etag in objects:
+            if manifest.get(key, etag) is None and cached.get(key, etag) is not None:
+                manifest.entries[key] = cached.entries[key]
+                manifest.dirty = True
+        for key, (text, entities) in parsed.items():
+            manifest.put(key, etags[key], text, entities)
+
+        manifest.prune(key for key, _ in objects)
+        save_manifest(s3_client, manifest)
+
+    resumes_data = []
+    for i, (key, etag) in enumerate(objects):
+        entry = manifest.get(key, etag)
+        if entry is None or not entry['text']:
+            continue
+        resumes_data.append({
+            'index': i,
+            'text': entry['text'],
+            'file_type': detect_file_type(key),
+            'filename': key,
+            'entities': entry['entities']
+        })
+
+    return resumes_data
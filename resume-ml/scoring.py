@@ -0,0 +1,138 @@
+"""
+Vectorized composite scoring.
+
+A batch of parsed resumes becomes arrays (skill bitsets over the taxonomy
+ids, a years-of-experience vector and semantic scores) and every
+component and composite score is computed with NumPy in one pass. The
+float operations match the scalar functions in ranker one for one, and
+match scores are rounded with Python's round() when results are built,
+so rankings are identical to the scalar path.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import WEIGHTS
+from job_profile import JobProfile
+from parser import get_skill_taxonomy, normalize_skill
+
+
+@dataclass
+class ResumeBatch:
+    """Parsed resumes as arrays"""
+
+    skill_bits: np.ndarray  # (n, ceil(skills / 8)) uint8; bit id % 8 of byte id // 8
+    has_skills: np.ndarray  # (n,) bool: any skill listed, known to the taxonomy or not
+    years: np.ndarray  # (n,) float64
+
+    def __len__(self):
+        return len(self.years)
+
+
+def build_resume_batch(entities_list: Sequence[Dict[str, Any]]) -> ResumeBatch:
+    skill_ids = get_skill_taxonomy().skill_ids
+    skill_bits = np.zeros((len(entities_list), (len(skill_ids) + 7) // 8), dtype=np.uint8)
+
+    for row, entities in enumerate(entities_list):
+        for skill in entities.get('skills', []):
+            skill_id = skill_ids.get(normalize_skill(skill))
+            if skill_id is not None:
+                skill_bits[row, skill_id >> 3] |= 1 << (skill_id & 7)
+
+    return ResumeBatch(
+        skill_bits=skill_bits,
+        has_skills=np.array([bool(e.get('skills')) for e in entities_list], dtype=bool),
+        years=np.array([e.get('years_of_experience', 0.0) for e in entities_list], dtype=np.float64)
+    )
+
+
+def required_skill_ids(job_profile: JobProfile) -> np.ndarray:
+    skill_ids = get_skill_taxonomy().skill_ids
+    return np.array(sorted(skill_ids[s] for s in job_profile.required_skills if s in skill_ids),
+                    dtype=np.int64)
+
+
+def skill_columns(batch: ResumeBatch, ids: np.ndarray) -> np.ndarray:
+    """(n, len(ids)) bool: which resumes have each of the given skills"""
+    return ((batch.skill_bits[:, ids >> 3] >> (ids & 7).astype(np.uint8)) & 1).astype(bool)
+
+
+def compute_skills_scores(batch: ResumeBatch, job_profile: JobProfile) -> np.ndarray:
+    """Vector form of ranker.compute_skills_match_score"""
+
+    if not job_profile.required_skills:
+        return np.full(len(batch), 0.5)
+
+    matched = skill_columns(batch, required_skill_ids(job_profile)).sum(axis=1)
+    scores = np.minimum(matched / len(job_profile.required_skills), 1.0)
+    scores[~batch.has_skills] = 0.0
+    return scores
+
+
+def compute_experience_scores(years: np.ndarray, required_years: Optional[float]) -> np.ndarray:
+    """Vector form of ranker.compute_experience_match_score"""
+
+    if required_years is None:
+        return np.select([years >= 5, years >= 2, years >= 1], [0.8, 0.6, 0.4], 0.2)
+
+    return np.select(
+        [years >= required_years, years >= required_years * 0.7, years >= required_years * 0.5],
+        [1.0, 0.7, 0.5], 0.3)
+
+
+def compute_composite_scores(semantic: np.ndarray, skills: np.ndarray, experience: np.ndarray) -> np.ndarray:
+    """Vector form of ranker.compute_composite_score (any matching shapes)"""
+
+    composite = (
+        WEIGHTS["semantic_similarity"] * semantic +
+        WEIGHTS["skills_match"] * skills +
+        WEIGHTS["experience_match"] * experience
+    )
+
+    return composite * 100
+
+
+def score_batch(
+    semantic: np.ndarray,
+    batch: ResumeBatch,
+    job_profile: JobProfile
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(composite, skills, experience) vectors for one job description"""
+
+    semantic = np.asarray(semantic, dtype=np.float64)
+    skills = compute_skills_scores(batch, job_profile)
+    experience = compute_experience_scores(batch.years, job_profile.required_years)
+
+    return compute_composite_scores(semantic, skills, experience), skills, experience
+
+
+def score_matrix(
+    semantic: np.ndarray,
+    batch: ResumeBatch,
+    job_profiles: List[JobProfile]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(composite, skills, experience) job x resume matrices for many job descriptions"""
+
+    semantic = np.asarray(semantic, dtype=np.float64)
+
+    # Count matches with one product over the skills any job requires
+    ids = np.unique(np.concatenate(
+        [required_skill_ids(p) for p in job_profiles] + [np.zeros(0, dtype=np.int64)]))
+    column = {skill_id: col for col, skill_id in enumerate(ids)}
+    required = np.zeros((len(job_profiles), len(ids)))
+    for j, profile in enumerate(job_profiles):
+        required[j, [column[i] for i in required_skill_ids(profile)]] = 1
+    matched = required @ skill_columns(batch, ids).T.astype(np.float64)
+
+    required_counts = np.array([len(p.required_skills) for p in job_profiles], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skills = np.minimum(matched / required_counts[:, None], 1.0)
+    skills[:, ~batch.has_skills] = 0.0
+    skills[required_counts == 0, :] = 0.5
+
+    experience = np.vstack([
+        compute_experience_scores(batch.years, p.required_years) for p in job_profiles
+    ]) if job_profiles else np.zeros((0, len(batch)))
+
+    return compute_composite_scores(semantic, skills, experience), skills, experience
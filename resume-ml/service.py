@@ -0,0 +1,494 @@
+"""
+Request handling shared by the Flask (app.py) and ASGI (asgi.py) servers.
+
+Handlers take already-parsed input and return (response_body, status)
+so both servers keep exactly the same contract.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    DEFAULT_TOP_K, PRELOAD_NER_MODEL, PREFILTER_SHORTLIST_SIZE, MAX_INGEST_PER_REQUEST
+)
+from corpus import (
+    CorpusSettingsMismatch, rank_stored_resumes, search_corpus, ingest_resumes, get_corpus
+)
+from jobs import get_job_queue, COMPLETED
+from parser import get_ner_pipeline
+from ranker import rank_resumes, rank_resumes_progressive, rank_resumes_multi, get_semantic_model
+from resume_sources import ResumeDocument, base64_documents, extract_resumes, iter_extracted_resumes
+from utils import (
+    validate_request, validate_resumes, validate_job_descriptions, format_error_response,
+    format_success_response, logger
+)
+
+Response = Tuple[Any, int]
+
+
+def warmup_models():
+    logger.info("Warming up ML models...")
+    try:
+        get_semantic_model()
+        # NER is loaded on first use unless every request needs it
+        if PRELOAD_NER_MODEL:
+            get_ner_pipeline()
+        logger.info("Models warmed up successfully")
+    except Exception as e:
+        logger.error(f"Error warming up models: {str(e)}")
+
+
+def parse_upload_form(form) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+    """
+    Validate the non-file fields of an upload form (anything with .get).
+    Returns (params, None) or (None, error_response).
+    """
+
+    job_description = form.get('job_description')
+
+    if not job_description:
+        return None, (format_error_response("Missing 'job_description' field"), 400)
+
+    if len(job_description.strip()) < 50:
+        return None, (format_error_response("Job description is too short (minimum 50 characters)"), 400)
+
+    top_k = form.get('top_k', DEFAULT_TOP_K)
+    try:
+        top_k = int(top_k)
+        if top_k < 1:
+            return None, (format_error_response("'top_k' must be a positive integer"), 400)
+    except (TypeError, ValueError):
+        return None, (format_error_response("'top_k' must be a valid integer"), 400)
+
+    shortlist_size = form.get('shortlist_size', PREFILTER_SHORTLIST_SIZE)
+    if shortlist_size is not None:
+        try:
+            shortlist_size = int(shortlist_size)
+            if shortlist_size < 1:
+                return None, (format_error_response("'shortlist_size' must be a positive integer"), 400)
+        except (TypeError, ValueError):
+            return None, (format_error_response("'shortlist_size' must be a valid integer"), 400)
+
+    return {
+        'job_description': job_description,
+        'top_k': top_k,
+        'shortlist_size': shortlist_size
+    }, None
+
+
+def parse_job_json(data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+    """
+    Validate a JSON /jobs body. Unlike form fields, JSON values arrive
+    typed, so strings and floats are rejected rather than coerced.
+    Returns (params, None) or (None, error_response).
+    """
+
+    if not isinstance(data, dict):
+        return None, (format_error_response("Request body must be a JSON object"), 400)
+
+    job_description = data.get('job_description')
+    if not job_description:
+        return None, (format_error_response("Missing 'job_description' field"), 400)
+    if not isinstance(job_description, str) or len(job_description.strip()) < 50:
+        return None, (format_error_response("Job description is too short (minimum 50 characters)"), 400)
+
+    # bool is an int subclass but not a count
+    top_k = data.get('top_k', DEFAULT_TOP_K)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        return None, (format_error_response("'top_k' must be a positive integer"), 400)
+
+    shortlist_size = data.get('shortlist_size', PREFILTER_SHORTLIST_SIZE)
+    if shortlist_size is not None and (
+            isinstance(shortlist_size, bool) or not isinstance(shortlist_size, int)
+            or shortlist_size < 1):
+        return None, (format_error_response("'shortlist_size' must be a positive integer"), 400)
+
+    for field in ('s3_bucket', 's3_prefix'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return None, (format_error_response(f"'{field}' must be a string"), 400)
+
+    return {
+        'job_description': job_description,
+        'top_k': top_k,
+        'shortlist_size': shortlist_size
+    }, None
+
+
+def rank_uploaded_documents(
+    documents: List[ResumeDocument],
+    job_description: str,
+    top_k: int,
+    shortlist_size: Optional[int],
+    start_time: float
+) -> Response:
+    """Extract and rank uploaded files (CPU-bound; run off the event loop)"""
+
+    # Extract text from all files in parallel
+    resumes_data = extract_resumes(documents)
+
+    if not resumes_data:
+        return format_error_response(
+            "No valid resumes could be processed. Please check file formats and content."
+        ), 400
+
+    if top_k > len(resumes_data):
+        top_k = len(resumes_data)
+
+    ranked_results = rank_resumes(
+        resumes_data, job_description, top_k, shortlist_size=shortlist_size)
+
+    processing_time = round(time.time() - start_time, 2)
+
+    logger.info(f"Request completed in {processing_time}s")
+
+    response = format_success_response(ranked_results, len(resumes_data))
+    response['processing_time_seconds'] = processing_time
+
+    return response, 200
+
+
+def rank_json_request(data: Dict[str, Any], start_time: float) -> Response:
+    """Handle a /rank_resumes JSON body (CPU-bound; run off the event loop)"""
+
+    # Validate request
+    is_valid, error_message = validate_request(data)
+    if not is_valid:
+        logger.warning(f"Invalid request: {error_message}")
+        return format_error_response(error_message), 200
+
+    # Extract parameters
+    job_description = data['job_description']
+    top_k = data.get('top_k', DEFAULT_TOP_K)
+
+    # Validate top_k
+    if not isinstance(top_k, int) or top_k < 1:
+        return format_error_response("'top_k' must be a positive integer"), 200
+
+    # Resumes already in the corpus are ranked from their stored records
+    if 'resumes' not in data:
+        try:
+            ranked_results, total_processed = rank_stored_resumes(
+                data['resume_ids'], job_description, top_k)
+        except CorpusSettingsMismatch as e:
+            logger.error(str(e))
+            return format_error_response(str(e)), 200
+
+        if total_processed == 0:
+            return format_error_response(
+                "None of the provided resume ids exist in the corpus"
+            ), 200
+
+        processing_time = round(time.time() - start_time, 2)
+
+        logger.info(f"Request completed in {processing_time}s")
+
+        response = format_success_response(ranked_results, total_processed)
+        response['processing_time_seconds'] = processing_time
+
+        return response, 200
+
+    resumes = data['resumes']
+
+    # Optional two-stage ranking
+    shortlist_size = data.get('shortlist_size', PREFILTER_SHORTLIST_SIZE)
+    if shortlist_size is not None and (not isinstance(shortlist_size, int) or shortlist_size < 1):
+        return format_error_response("'shortlist_size' must be a positive integer"), 200
+
+    if top_k > len(resumes):
+        top_k = len(resumes)
+
+    logger.info(
+        f"Processing {len(resumes)} resumes, returning top {top_k}")
+
+    # Decode resumes
+    documents = base64_documents(resumes)
+
+    # Extract text from all files in parallel
+    resumes_data = extract_resumes(documents)
+
+    if not resumes_data:
+        return format_error_response(
+            "No valid resumes could be processed. Please check file formats and content."
+        ), 200
+
+    # Rank resumes
+    ranked_results = rank_resumes(
+        resumes_data, job_description, top_k, shortlist_size=shortlist_size)
+
+    # Calculate processing time
+    processing_time = round(time.time() - start_time, 2)
+
+    logger.info(f"Request completed in {processing_time}s")
+
+    # Format response
+    response = format_success_response(ranked_results, len(resumes_data))
+    response['processing_time_seconds'] = processing_time
+
+    return response, 200
+
+
+def parse_stream_json(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+    """
+    Validate a JSON /rank_resumes_stream body (base64 'resumes' only).
+    Returns (params, None) or (None, error_response).
+    """
+
+    is_valid, error_message = validate_request(data)
+    if not is_valid:
+        return None, (format_error_response(error_message), 400)
+
+    if 'resumes' not in data:
+        return None, (format_error_response("Missing 'resumes' field"), 400)
+
+    top_k = data.get('top_k', DEFAULT_TOP_K)
+    if not isinstance(top_k, int) or top_k < 1:
+        return None, (format_error_response("'top_k' must be a positive integer"), 400)
+
+    return {
+        'job_description': data['job_description'],
+        'top_k': top_k,
+        'documents': base64_documents(data['resumes'])
+    }, None
+
+
+def stream_ranking(
+    documents: List[ResumeDocument],
+    job_description: str,
+    top_k: int,
+    start_time: float
+) -> Iterator[str]:
+    """
+    NDJSON lines: one {"type": "resume"} line per resume as soon as it is
+    extracted and scored, then a {"type": "summary"} line carrying the usual
+    ranking response. Failures after streaming starts end with a
+    {"type": "error"} line.
+    """
+
+    try:
+        resumes = iter_extracted_resumes(documents)
+
+        for event in rank_resumes_progressive(resumes, job_description, top_k):
+            if event['type'] == 'summary':
+                if event['total_resumes_processed'] == 0:
+                    event = {
+                        "type": "error",
+                        "success": False,
+                        "error": "No valid resumes could be processed. Please check file formats and content."
+                    }
+                else:
+                    event = {
+                        "type": "summary",
+                        **format_success_response(event['ranked_resumes'], event['total_resumes_processed']),
+                        "processing_time_seconds": round(time.time() - start_time, 2)
+                    }
+                    logger.info(
+                        f"Streamed ranking completed in {event['processing_time_seconds']}s")
+
+            yield json.dumps(event) + "\n"
+
+    except Exception as e:
+        logger.error(f"Streaming ranking failed: {str(e)}", exc_info=True)
+        yield json.dumps({
+            "type": "error",
+            "success": False,
+            "error": f"Internal server error: {str(e)}"
+        }) + "\n"
+
+
+def parse_multi_params(job_descriptions: Any, top_k: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+    """
+    Validate /rank_resumes_multi parameters from a form or JSON body.
+    Returns (params, None) or (None, error_response).
+    """
+
+    is_valid, error_message = validate_job_descriptions(job_descriptions)
+    if not is_valid:
+        return None, (format_error_response(error_message), 400)
+
+    try:
+        top_k = int(top_k)
+        if top_k < 1:
+            return None, (format_error_response("'top_k' must be a positive integer"), 400)
+    except (TypeError, ValueError):
+        return None, (format_error_response("'top_k' must be a valid integer"), 400)
+
+    return {'job_descriptions': job_descriptions, 'top_k': top_k}, None
+
+
+def rank_multi_documents(
+    documents: List[ResumeDocument],
+    job_descriptions: List[str],
+    top_k: int,
+    start_time: float
+) -> Response:
+    """Extract a resume pool once and rank it against every job description"""
+
+    resumes_data = extract_resumes(documents)
+
+    if not resumes_data:
+        return format_error_response(
+            "No valid resumes could be processed. Please check file formats and content."
+        ), 400
+
+    results = rank_resumes_multi(resumes_data, job_descriptions, top_k)
+
+    processing_time = round(time.time() - start_time, 2)
+
+    logger.info(
+        f"Ranked {len(resumes_data)} resumes against {len(job_descriptions)} job descriptions in {processing_time}s")
+
+    return {
+        "success": True,
+        "total_resumes_processed": len(resumes_data),
+        "total_job_descriptions": len(job_descriptions),
+        "results": results,
+        "processing_time_seconds": processing_time
+    }, 200
+
+
+def parse_multi_json(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Response]]:
+    """
+    Validate a JSON /rank_resumes_multi body (base64 'resumes' only).
+    Returns (params, None) or (None, error_response).
+    """
+
+    params, error = parse_multi_params(
+        data.get('job_descriptions'), data.get('top_k', DEFAULT_TOP_K))
+    if error:
+        return None, error
+
+    is_valid, error_message = validate_resumes(data.get('resumes'))
+    if not is_valid:
+        return None, (format_error_response(error_message), 400)
+
+    params['documents'] = base64_documents(data['resumes'])
+    return params, None
+
+
+def corpus_search_request(data: Dict[str, Any], start_time: float) -> Response:
+    """Handle a /corpus/search JSON body"""
+
+    job_description = data.get('job_description')
+    if not isinstance(job_description, str) or len(job_description.strip()) < 50:
+        return format_error_response(
+            "Job description must be a string of at least 50 characters"), 400
+
+    top_k = data.get('top_k', DEFAULT_TOP_K)
+    if not isinstance(top_k, int) or top_k < 1:
+        return format_error_response("'top_k' must be a positive integer"), 400
+
+    try:
+        ranked_results, total_scored = search_corpus(job_description, top_k)
+    except CorpusSettingsMismatch as e:
+        logger.error(str(e))
+        return format_error_response(str(e)), 409
+
+    processing_time = round(time.time() - start_time, 3)
+
+    logger.info(f"Corpus search completed in {processing_time}s")
+
+    response = format_success_response(ranked_results, total_scored)
+    response['processing_time_seconds'] = processing_time
+
+    return response, 200
+
+
+def parse_ingest_json(data: Dict[str, Any]) -> Tuple[Optional[List[ResumeDocument]], Optional[Response]]:
+    """
+    Validate a JSON /corpus/resumes body (base64 'resumes' only).
+    Returns (documents, None) or (None, error_response).
+    """
+
+    is_valid, error_message = validate_resumes(data.get('resumes'), MAX_INGEST_PER_REQUEST)
+    if not is_valid:
+        return None, (format_error_response(error_message), 400)
+
+    return base64_documents(data['resumes']), None
+
+
+def ingest_documents(documents: List[ResumeDocument], start_time: float) -> Response:
+    """Extract documents and add the new ones to the corpus"""
+
+    resumes_data = extract_resumes(documents)
+
+    if not resumes_data:
+        return format_error_response(
+            "No valid resumes could be processed. Please check file formats and content."
+        ), 400
+
+    try:
+        results = ingest_resumes(resumes_data)
+    except CorpusSettingsMismatch as e:
+        logger.error(str(e))
+        return format_error_response(str(e)), 409
+
+    processing_time = round(time.time() - start_time, 2)
+
+    logger.info(f"Corpus ingestion completed in {processing_time}s")
+
+    return {
+        "success": True,
+        "total_resumes_processed": len(results),
+        "added": sum(1 for r in results if not r['duplicate']),
+        "duplicates": sum(1 for r in results if r['duplicate']),
+        "resumes": results,
+        "processing_time_seconds": processing_time
+    }, 200
+
+
+def delete_corpus_resume(resume_id: int) -> Response:
+
+    try:
+        if not get_corpus().delete(resume_id):
+            return format_error_response(f"Resume {resume_id} not found"), 404
+    except CorpusSettingsMismatch as e:
+        logger.error(str(e))
+        return format_error_response(str(e)), 409
+
+    return {"success": True, "resume_id": resume_id}, 200
+
+
+def submit_s3_job(data: Any) -> Response:
+    """Queue a background job over an S3 prefix from a JSON /jobs body"""
+
+    params, error = parse_job_json(data)
+    if error:
+        return error
+
+    s3_bucket = data.get('s3_bucket') or os.environ.get('RESUME_BUCKET')
+    if not s3_bucket:
+        return format_error_response("Provide 'resumes' files or an 's3_bucket'"), 400
+
+    job = get_job_queue().submit_s3(
+        bucket=s3_bucket, prefix=data.get('s3_prefix') or '', **params)
+    return {"success": True, "job": job.to_dict()}, 202
+
+
+def submit_upload_job(files, params: Dict[str, Any]) -> Response:
+    """Queue a background job over uploads with Werkzeug-style .filename and .save"""
+
+    job = get_job_queue().submit_files(files=files, **params)
+    return {"success": True, "job": job.to_dict()}, 202
+
+
+def job_status(job_id: str) -> Response:
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return format_error_response(f"Job {job_id} not found"), 404
+
+    return {"success": True, "job": job.to_dict()}, 200
+
+
+def job_result(job_id: str) -> Response:
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return format_error_response(f"Job {job_id} not found"), 404
+
+    if job.status != COMPLETED:
+        return format_error_response(
+            f"Job {job_id} is {job.status}" + (f": {job.error}" if job.error else "")), 409
+
+    return get_job_queue().load_result(job), 200
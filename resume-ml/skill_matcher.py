@@ -0,0 +1,54 @@
+import re
+from typing import Iterable, Set
+
+
+class SkillMatcher:
+    """
+    Find every keyword of a fixed vocabulary in a single regex pass.
+
+    Keywords are compiled once into a character trie, so the regex engine
+    branches on the next character instead of trying each keyword in turn.
+    A match must not touch a word character on either side, which keeps
+    "java" out of "javascript" while still matching "c++" or "ci/cd". It
+    must not follow a dot either, so the "js" alias is not found in
+    "node.js" or "vue.js".
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({k.lower() for k in keywords if k})
+        # The lookahead makes matches zero-width, so overlapping keywords
+        # (e.g. "machine learning" and "learning") are all reported
+        self._pattern = re.compile(
+            r'(?<![\w.])(?=(' + _trie_regex(self.keywords) + r')(?!\w))')
+
+    def find(self, text: str) -> Set[str]:
+        """Return the lowercase keywords present in `text`"""
+        if not text or not self.keywords:
+            return set()
+        return {match.group(1) for match in self._pattern.finditer(text.lower())}
+
+
+def _trie_regex(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True  # End-of-keyword marker
+    return _node_regex(trie)
+
+
+def _node_regex(node):
+    terminal = '' in node
+    branches = [re.escape(char) + _node_regex(child)
+                for char, child in sorted(node.items()) if char != '']
+
+    if not branches:
+        return ''
+
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+
+    group = '(?:' + '|'.join(branches) + ')'
+    # Optional tail: prefer the longer keyword, fall back to the shorter one
+    return group + '?' if terminal else group
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from skill_matcher import SkillMatcher
+from utils import logger
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills plus their aliases (e.g. "k8s" -> "kubernetes").
+
+    Every surface form is compiled into one SkillMatcher, and aliases are
+    resolved through a dict, so lookups stay flat as the taxonomy grows.
+    """
+
+    def __init__(self, skills: Dict[str, Iterable[str]]):
+        self.skills: List[str] = sorted({s.lower() for s in skills})
+        self.skill_ids: Dict[str, int] = {
+            skill: i for i, skill in enumerate(self.skills)}
+
+        # Surface form -> canonical skill (canonical names map to themselves)
+        self.aliases: Dict[str, str] = {skill: skill for skill in self.skills}
+        for skill, aliases in skills.items():
+            for alias in aliases:
+                alias = alias.strip().lower()
+                if alias and alias not in self.skill_ids:
+                    self.aliases.setdefault(alias, skill.lower())
+
+        self._matcher = SkillMatcher(self.aliases)
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[str]) -> "SkillTaxonomy":
+        return cls({keyword: [] for keyword in keywords})
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        """
+        Load a taxonomy file (optionally gzipped): one canonical skill per
+        line, followed by a tab and "|"-separated aliases.
+        """
+        opener = gzip.open if path.endswith('.gz') else open
+        skills = {}
+
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line.strip() or line.startswith('#'):
+                    continue
+                canonical, _, aliases = line.partition('\t')
+                canonical = canonical.strip().lower()
+                if canonical:
+                    skills.setdefault(canonical, []).extend(
+                        a for a in aliases.split('|') if a.strip())
+
+        return cls(skills)
+
+    def normalize(self, skill: str) -> Optional[str]:
+        """Canonical name for a skill or alias, None if unknown"""
+        return self.aliases.get(skill.strip().lower())
+
+    def find(self, text: str) -> Set[str]:
+        """Canonical skills mentioned in `text`"""
+        return {self.aliases[form] for form in self._matcher.find(text)}
+
+    def fingerprint(self) -> str:
+        """Digest of every surface form and its canonical skill"""
+        digest = hashlib.sha256()
+        for alias, skill in sorted(self.aliases.items()):
+            digest.update(f"{alias}\t{skill}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def __len__(self):
+        return len(self.skills)
+
+
+def load_skill_taxonomy(path: str, fallback_keywords: Iterable[str]) -> SkillTaxonomy:
+    """Load the taxonomy file, or build one from the built-in keyword list"""
+    if path and os.path.exists(path):
+        try:
+            taxonomy = SkillTaxonomy.from_file(path)
+            logger.info(
+                f"Loaded skill taxonomy with {len(taxonomy)} skills and "
+                f"{len(taxonomy.aliases)} surface forms from {path}")
+            return taxonomy
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading skill taxonomy {path}: {str(e)}")
+
+    logger.warning("Skill taxonomy not found, using built-in SKILL_KEYWORDS")
+    return SkillTaxonomy.from_keywords(fallback_keywords)
@@ -2,7 +2,7 @@
 import logging
 import re
 from typing import List, Dict, Any
-from config import MAX_RESUMES_PER_REQUEST
+from config import MAX_RESUMES_PER_REQUEST, MAX_RESUME_IDS_PER_REQUEST, MAX_JOB_DESCRIPTIONS_PER_REQUEST
 
 # Setup logging
 
@@ -30,7 +30,7 @@ def validate_request(data: Dict[str, Any]) -> tuple[bool, str]:
     if 'job_description' not in data:
         return False, "Missing 'job_description' field"
 
-    if 'resumes' not in data:
+    if 'resumes' not in data and 'resume_ids' not in data:
         return False, "Missing 'resumes' field"
 
     job_description = data['job_description']
@@ -40,15 +40,23 @@ def validate_request(data: Dict[str, Any]) -> tuple[bool, str]:
     if len(job_description) < 50:
         return False, "Job description is too short (minimum 50 characters)"
 
-    resumes = data['resumes']
+    # Resumes already stored in the corpus can be referenced by id
+    if 'resumes' not in data:
+        return validate_resume_ids(data['resume_ids'])
+
+    return validate_resumes(data['resumes'])
+
+
+def validate_resumes(resumes: Any, max_resumes: int = MAX_RESUMES_PER_REQUEST) -> tuple[bool, str]:
+
     if not isinstance(resumes, list):
         return False, "'resumes' must be a list"
 
     if len(resumes) == 0:
         return False, "No resumes provided"
 
-    if len(resumes) > MAX_RESUMES_PER_REQUEST:
-        return False, f"Too many resumes (maximum {MAX_RESUMES_PER_REQUEST})"
+    if len(resumes) > max_resumes:
+        return False, f"Too many resumes (maximum {max_resumes})"
 
     # Validate each resume
     for idx, resume in enumerate(resumes):
@@ -64,6 +72,42 @@ def validate_request(data: Dict[str, Any]) -> tuple[bool, str]:
     return True, ""
 
 
+def validate_resume_ids(resume_ids: Any) -> tuple[bool, str]:
+
+    if not isinstance(resume_ids, list):
+        return False, "'resume_ids' must be a list"
+
+    if len(resume_ids) == 0:
+        return False, "No resume ids provided"
+
+    if len(resume_ids) > MAX_RESUME_IDS_PER_REQUEST:
+        return False, f"Too many resume ids (maximum {MAX_RESUME_IDS_PER_REQUEST})"
+
+    for idx, resume_id in enumerate(resume_ids):
+        if not isinstance(resume_id, int) or isinstance(resume_id, bool):
+            return False, f"Resume id at index {idx} must be an integer"
+
+    return True, ""
+
+
+def validate_job_descriptions(job_descriptions: Any) -> tuple[bool, str]:
+
+    if not isinstance(job_descriptions, list):
+        return False, "'job_descriptions' must be a list"
+
+    if len(job_descriptions) == 0:
+        return False, "No job descriptions provided"
+
+    if len(job_descriptions) > MAX_JOB_DESCRIPTIONS_PER_REQUEST:
+        return False, f"Too many job descriptions (maximum {MAX_JOB_DESCRIPTIONS_PER_REQUEST})"
+
+    for idx, job_description in enumerate(job_descriptions):
+        if not isinstance(job_description, str) or len(job_description.strip()) < 50:
+            return False, f"Job description at index {idx} must be a string of at least 50 characters"
+
+    return True, ""
+
+
 def clean_text(text: str) -> str:
 
     if not text: